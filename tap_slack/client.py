@@ -2,32 +2,94 @@
 
 from __future__ import annotations
 
+import json
 import time
-from typing import Any
+from collections.abc import Callable, Generator, Iterable, Mapping
+from functools import cached_property, partial
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
 
-from requests import Response
-from singer_sdk.authenticators import BearerTokenAuthenticator
-from singer_sdk.pagination import JSONPathPaginator
+import requests
+import singer_sdk.singerlib as singer
+from requests.auth import AuthBase
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+from singer_sdk.helpers._util import utc_now
+from singer_sdk.pagination import BaseAPIPaginator
 from singer_sdk.streams import RESTStream
 
+from tap_slack.concurrency import context_key
+from tap_slack.conform import compile_conformer
+from tap_slack.rate_limit import RateLimiter
+from tap_slack.state import IndexedStateManager
 
-class ThrottledJSONPathPaginator(JSONPathPaginator):
-    """A throttled paginator."""
+if TYPE_CHECKING:
+    from singer_sdk.helpers._batch import BatchConfig
 
-    max_requests_per_minute = 200
+try:
+    import orjson
 
-    def get_next(self, response: Response) -> str | None:
-        """Get the next page token.
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
-        Args:
-            response: API response object.
+# Seconds to wait when Slack rate limits a call without a Retry-After header.
+DEFAULT_RETRY_AFTER = 30
 
-        Returns:
-            The next page token.
-        """
-        if self.max_requests_per_minute:
-            time.sleep(60.0 / self.max_requests_per_minute)
-        return super().get_next(response)
+
+def response_json(response: requests.Response) -> dict:
+    """Decode a response body once, caching the result on the response."""
+    payload = getattr(response, "_slack_json", None)
+    if payload is None:
+        payload = json_loads(response.content)
+        response._slack_json = payload
+    return payload
+
+
+class SlackRateLimitError(RetriableAPIError):
+    """Slack rejected a call because its method's rate limit was exceeded."""
+
+    def __init__(self, msg: str, response: requests.Response) -> None:
+        super().__init__(msg, response)
+        self.retry_after = float(
+            response.headers.get("Retry-After", DEFAULT_RETRY_AFTER)
+        )
+
+
+def next_cursor(response: requests.Response) -> str | None:
+    """Return the cursor of the page after a response, if any."""
+    metadata = response_json(response).get("response_metadata") or {}
+    return metadata.get("next_cursor") or None
+
+
+class SlackInvalidCursorError(FatalAPIError):
+    """Slack rejected a pagination cursor, e.g. one that has expired."""
+
+
+class SlackResponseNotCachedError(FatalAPIError):
+    """A request is missing from the response cache being replayed."""
+
+
+class SlackAuthenticator(AuthBase):
+    """Bearer token authentication that keeps a token already set on a
+    request, so that requests can carry the token of their own workspace."""
+
+    def __init__(self, token: str | None) -> None:
+        self.token = token
+
+    def __call__(self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+        request.headers.setdefault("Authorization", f"Bearer {self.token}")
+        return request
+
+
+class SlackCursorPaginator(BaseAPIPaginator):
+    """Paginator following Slack's `response_metadata.next_cursor`."""
+
+    def __init__(self) -> None:
+        super().__init__(None)
+
+    def get_next(self, response: requests.Response) -> str | None:
+        """Return the cursor of the next page, if any."""
+        return next_cursor(response)
 
 
 class SlackStream(RESTStream):
@@ -35,13 +97,67 @@ class SlackStream(RESTStream):
 
     _page_size = 500
     url_base = "https://slack.com/api"
-    records_jsonpath = "$[*]"
-    next_page_token_jsonpath = "$.response_metadata.next_cursor"
+    # Key of the records list in the API response, e.g. "messages".
+    records_key: str
+    # Whether the stream writes BATCH messages when `batch_config` is set.
+    supports_batches = False
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._prefetched_records: dict[tuple, Iterable[dict]] = {}
+        # Records emitted since the first, when sampling records to conform.
+        self._sampled_records = 0
+        self._unmapped_properties: set[str] = set()
+        if self._tap.workspace_partitions:
+            self.primary_keys = ["team_id", *self.primary_keys]
+
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the HTTP session shared by all streams of the tap."""
+        return self._tap.http_session
 
     @property
-    def authenticator(self) -> BearerTokenAuthenticator:
+    def authenticator(self) -> SlackAuthenticator:
         """Return a new authenticator object."""
-        return BearerTokenAuthenticator(token=self.config.get("api_key"))
+        return SlackAuthenticator(self.config.get("api_key"))
+
+    @property
+    def state_manager(self) -> IndexedStateManager:
+        """Return the stream's state manager, which indexes partition states."""
+        if self._state_manager is None:
+            self._state_manager = IndexedStateManager(
+                tap_name=self.tap_name,
+                stream_name=self.name,
+                tap_state=self._tap_state,
+                state_partitioning_keys=self.state_partitioning_keys,
+                is_sorted=self.is_sorted,
+                check_sorted=self.check_sorted,
+            )
+        return self._state_manager
+
+    def _write_state_message(self, *, force: bool = False) -> None:
+        """Write a STATE message, at most every `state_message_interval`
+        seconds unless forced. Skipped messages are left to the next one, and
+        the tap writes the last state at the end of the sync."""
+        throttle = self._tap.state_message_throttle
+        if self.state_manager.is_flushed or not (force or throttle.due()):
+            return
+        super()._write_state_message()
+        throttle.written()
+
+    def rate_limiter(self, context: dict | None) -> RateLimiter:
+        """Return the rate limiter of the context's workspace."""
+        return self._tap.rate_limiters[(context or {}).get("team_id")]
+
+    def auth_headers(self, context: dict | None) -> dict[str, str]:
+        """Return the headers authenticating requests to the context's workspace."""
+        token = self._tap.workspaces[(context or {}).get("team_id")]
+        return {"Authorization": f"Bearer {token}"}
+
+    @property
+    def api_method(self) -> str:
+        """Return the Slack API method name, used to look up its rate limit."""
+        return self.path.lstrip("/")
 
     @property
     def expectations(self) -> list[str]:
@@ -51,6 +167,72 @@ class SlackStream(RESTStream):
             "stream__primary_key",
         ]
 
+    @cached_property
+    def batching(self) -> bool:
+        """Whether the stream writes BATCH messages."""
+        return self.get_batch_config(self.config) is not None
+
+    def get_batch_config(self, config: Mapping) -> BatchConfig | None:
+        """Batch only the streams with many records, emitting records otherwise."""
+        if not self.supports_batches:
+            return None
+        return super().get_batch_config(config)
+
+    @cached_property
+    def record_conformance(self) -> str:
+        """Return how many of the stream's records to conform to its schema.
+
+        Records are emitted as fetched when conformance is skipped, so it is
+        only skipped for streams without deselected properties.
+        """
+        mode = self.config["record_conformance"].get(self.name, "full")
+        if mode != "full" and not all(self.mask.values()):
+            self.logger.warning(
+                "Conforming every %s record, as some properties are deselected",
+                self.name,
+            )
+            return "full"
+        return mode
+
+    @cached_property
+    def _conformer(self) -> Callable[[dict, set], dict]:
+        return compile_conformer(self.effective_schema, self.mask)
+
+    def _conforms_next_record(self) -> bool:
+        if self.record_conformance == "full":
+            return True
+        if self.record_conformance == "none":
+            return False
+        sampled = self._sampled_records % self.config["record_conformance_sample_rate"]
+        self._sampled_records += 1
+        return sampled == 0
+
+    def _generate_record_messages(
+        self, record: dict
+    ) -> Generator[singer.RecordMessage, None, None]:
+        """Conform records with a conformer compiled from the stream's schema,
+        skipping all or most of them as set by `record_conformance`."""
+        if self._conforms_next_record():
+            unmapped: set[str] = set()
+            record = self._conformer(record, unmapped)
+            if unmapped - self._unmapped_properties:
+                self._unmapped_properties.update(unmapped)
+                self.logger.warning(
+                    "Properties %s were present in the '%s' stream but not found "
+                    "in catalog schema. Ignoring.",
+                    sorted(unmapped),
+                    self.name,
+                )
+        for stream_map in self.stream_maps:
+            mapped_record = stream_map.transform(record)
+            if mapped_record is not None:
+                yield singer.RecordMessage(
+                    stream=stream_map.stream_alias,
+                    record=mapped_record,
+                    version=self._stream_version,
+                    time_extracted=utc_now(),
+                )
+
     def get_url_params(
         self, context: dict | None, next_page_token: str | None
     ) -> dict[str, Any]:
@@ -59,13 +241,171 @@ class SlackStream(RESTStream):
         if next_page_token:
             params["cursor"] = next_page_token
         if self._page_size:
-            params["limit"] = self._page_size
+            params["limit"] = self._page_limit(context)
         if context and "channel_id" in context:
             params["channel"] = context["channel_id"]
         if context and "thread_ts" in context:
             params["ts"] = context["thread_ts"]
         return params
 
-    def get_new_paginator(self):
-        """Override default to apply rate throttling for streams."""
-        return ThrottledJSONPathPaginator(self.next_page_token_jsonpath)
+    def _page_key(self, context: dict | None) -> tuple:
+        context = context or {}
+        return context.get("team_id"), context.get("channel_id")
+
+    def _page_limit(self, context: dict | None) -> int:
+        """Return the page size of the next request, adapted to the pages of
+        the context's channel fetched so far with `adaptive_page_size`."""
+        if not self.config["adaptive_page_size"]:
+            return self._page_size
+        return self._tap.page_sizer.limit(
+            self.api_method, self._page_key(context), self._page_size
+        )
+
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Yield the records listed under the stream's key in the response."""
+        yield from response_json(response).get(self.records_key, ())
+
+    def get_new_paginator(self) -> SlackCursorPaginator:
+        """Return a paginator reading the cursor from the decoded response."""
+        return SlackCursorPaginator()
+
+    def get_records(self, context: dict | None) -> Iterable[dict]:
+        """Return records already fetched for the context, else request them."""
+        records = self._prefetched_records.pop(context_key(context), None)
+        if records is None:
+            records = super().get_records(context)
+        yield from records
+
+    def prefetch(self, context: dict) -> Callable[[], Iterable[dict]]:
+        """Return a function requesting the context's records from a worker thread.
+
+        Called from the main thread, so streams can read their state here.
+        """
+        return partial(self.request_records, context)
+
+    def sync_prefetched(self, context: dict, records: Iterable[dict]) -> None:
+        """Sync a context from records fetched ahead of time by a worker."""
+        self._prefetched_records[context_key(context)] = records
+        try:
+            self.sync(context=context)
+        finally:
+            self._prefetched_records.pop(context_key(context), None)
+
+    def validate_response(self, response: requests.Response) -> None:
+        """
+        Treat HTTP 429 and `ratelimited` errors as retriable rate limit errors,
+        and `invalid_cursor` errors as `SlackInvalidCursorError`. Only the body
+        of 200 responses is decoded, as error pages, e.g. from a proxy, may not
+        be JSON; other statuses are left to the SDK.
+        """
+        if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            raise SlackRateLimitError(self.response_error_message(response), response)
+        if response.status_code != HTTPStatus.OK:
+            super().validate_response(response)
+            return
+        try:
+            error = response_json(response).get("error")
+        except ValueError as ex:
+            msg = f"Could not decode the response body: {ex}"
+            raise RetriableAPIError(msg, response) from ex
+        if error == "ratelimited":
+            raise SlackRateLimitError(self.response_error_message(response), response)
+        if error == "invalid_cursor":
+            raise SlackInvalidCursorError(self.response_error_message(response))
+        super().validate_response(response)
+
+    def backoff_wait_generator(self) -> Generator[float, Any, None]:
+        """Leave waiting after rate limit errors to the paused rate limiter."""
+        wait = 2.0
+        exception = yield 0
+        while True:
+            if isinstance(exception, SlackRateLimitError):
+                exception = yield 0
+            else:
+                exception = yield wait
+                wait *= 2
+
+    def _request(
+        self, prepared_request: requests.PreparedRequest, context: dict | None
+    ) -> requests.Response:
+        """
+        Wait on the per-method rate limiter of the context's workspace before
+        each request, and send it with the workspace's token. The limiter
+        slows down when Slack throttles the method.
+
+        With `response_cache_mode`, responses are served from and stored in
+        the response cache, without counting toward the rate limits.
+        """
+        cache = self._tap.response_cache
+        if cache is not None:
+            cache_key = cache.key((context or {}).get("team_id"), prepared_request)
+            response = cache.get(cache_key, prepared_request)
+            if response is not None:
+                return response
+            if cache.replay_only:
+                raise SlackResponseNotCachedError(
+                    f"No cached response for {prepared_request.path_url}"
+                )
+        metrics = self._tap.metrics
+        rate_limiter = self.rate_limiter(context)
+        channel_id = (context or {}).get("channel_id")
+        team_id = (context or {}).get("team_id")
+        waited = rate_limiter.acquire(self.api_method)
+        if waited:
+            metrics.slept(self.api_method, channel_id, waited, team_id=team_id)
+        prepared_request.headers.update(self.auth_headers(context))
+        response = None
+        started = time.perf_counter()
+        seconds = 0.0
+        throttled = False
+        try:
+            response = super()._request(prepared_request, context)
+            rate_limiter.succeeded(self.api_method)
+        except SlackRateLimitError as ex:
+            response = ex.response
+            throttled = True
+            rate_limiter.throttled(self.api_method, ex.retry_after)
+            raise
+        except Exception as ex:
+            response = getattr(ex, "response", None)
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            metrics.request(
+                self.api_method,
+                channel_id,
+                seconds,
+                len(response.content) if response is not None else 0,
+                throttled=throttled,
+                team_id=team_id,
+            )
+        if self._page_size and self.config["adaptive_page_size"]:
+            self._tap.page_sizer.observe(
+                self.api_method,
+                self._page_key(context),
+                records=len(response_json(response).get(self.records_key) or ()),
+                size=len(response.content),
+                seconds=seconds,
+                has_more=next_cursor(response) is not None,
+            )
+        if cache is not None:
+            cache.put(cache_key, response)
+        return response
+
+    def post_process(self, row: dict, context: dict | None = None) -> dict | None:
+        """
+        Key records by workspace when syncing several. Records that carry a
+        team_id of their own, such as the home team of users on Enterprise
+        Grid, are keyed by the workspace they were synced from too.
+        """
+        if context and "team_id" in context:
+            row["team_id"] = context["team_id"]
+        return row
+
+    def _increment_stream_state(self, latest_record: dict, *, context=None) -> None:
+        """Count each record emitted, then advance the bookmark."""
+        keys = context or {}
+        self._tap.metrics.emitted(
+            self.api_method, keys.get("channel_id"), team_id=keys.get("team_id")
+        )
+        super()._increment_stream_state(latest_record, context=context)
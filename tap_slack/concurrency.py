@@ -0,0 +1,137 @@
+"""Worker pools that fetch records ahead of the thread writing Singer messages."""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+
+def context_key(context: dict | None) -> tuple:
+    """Return a hashable key for a stream context."""
+    return tuple(sorted((context or {}).items()))
+
+
+class PrefetchedRecords:
+    """Records of one request chain, buffered by a worker thread.
+
+    Iterating yields the records in the order they were fetched, waiting for
+    the worker as needed, and re-raises any error the worker ran into. With a
+    ``max_buffered`` limit, the worker pauses while the buffer is full.
+    """
+
+    def __init__(self, max_buffered: int = 0) -> None:
+        self._buffer: deque[dict] = deque()
+        self._max_buffered = max_buffered
+        self._condition = threading.Condition()
+        self._error: BaseException | None = None
+        self._cancelled = False
+        self.finished = False
+
+    def produce(self, records: Iterable[dict]) -> None:
+        """Buffer every record, run from a worker thread."""
+        try:
+            for record in records:
+                with self._condition:
+                    while self._is_full() and not self._cancelled:
+                        self._condition.wait()
+                    if self._cancelled:
+                        return
+                    self._buffer.append(record)
+                    self._condition.notify_all()
+        except BaseException as ex:  # noqa: BLE001 - re-raised in __iter__
+            # Any error must reach the consumer, or the records would look
+            # complete when the worker stopped partway through.
+            self._error = ex
+        finally:
+            # Closing a cancelled generator runs its cleanup now, such as
+            # closing the prefetcher of backfill windows it fetches through.
+            if isinstance(records, Generator):
+                records.close()
+            with self._condition:
+                self.finished = True
+                self._condition.notify_all()
+
+    def cancel(self) -> None:
+        """Stop the worker at its next record."""
+        with self._condition:
+            self._cancelled = True
+            self._buffer.clear()
+            self._condition.notify_all()
+
+    def _is_full(self) -> bool:
+        return bool(self._max_buffered) and len(self._buffer) >= self._max_buffered
+
+    def __iter__(self) -> Iterator[dict]:
+        while True:
+            with self._condition:
+                while not self._buffer and not self.finished:
+                    self._condition.wait()
+                records = list(self._buffer)
+                self._buffer.clear()
+                self._condition.notify_all()
+                if not records:
+                    if self._error is not None:
+                        raise self._error
+                    return
+            yield from records
+
+
+class Prefetcher:
+    """Fetches records for queued jobs on a bounded pool of worker threads.
+
+    Workers only make requests and parse responses. The thread consuming the
+    results stays responsible for writing records and updating state, which
+    keeps Singer output serialized.
+
+    Closing the prefetcher cancels the jobs that were not returned yet, and
+    those returned while their records were still streaming in, so that no
+    worker stays blocked on a full buffer nobody reads.
+    """
+
+    def __init__(self, max_workers: int, max_buffered: int = 0) -> None:
+        self.max_workers = max_workers
+        self._max_buffered = max_buffered
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tap-slack"
+        )
+        self._pending: list[tuple[Any, PrefetchedRecords]] = []
+        # Returned jobs whose workers may still be producing records.
+        self._streaming: list[PrefetchedRecords] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, job: Any, fetch: Callable[[], Iterable[dict]]) -> None:
+        """Start fetching the records of a job, such as a stream context."""
+        records = PrefetchedRecords(self._max_buffered)
+        self._pending.append((job, records))
+        self._executor.submit(lambda: records.produce(fetch()))
+
+    def pop_ready(self, *, block: bool = False) -> tuple[Any, PrefetchedRecords] | None:
+        """Return a job whose records are fully fetched.
+
+        When ``block`` is set and no job is finished yet, return the oldest
+        submitted job instead, whose records are still streaming in.
+        """
+        for index, (_, records) in enumerate(self._pending):
+            if records.finished:
+                return self._pending.pop(index)
+        if block and self._pending:
+            job = self._pending.pop(0)
+            self._streaming = [r for r in self._streaming if not r.finished]
+            self._streaming.append(job[1])
+            return job
+        return None
+
+    def close(self) -> None:
+        """Cancel outstanding fetches and release the worker threads."""
+        for _, records in self._pending:
+            records.cancel()
+        for records in self._streaming:
+            records.cancel()
+        self._pending.clear()
+        self._streaming.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
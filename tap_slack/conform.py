@@ -0,0 +1,104 @@
+"""Record conformers compiled from stream schemas.
+
+The SDK walks the schema alongside every record, first to drop deselected
+properties and then to drop unknown properties and coerce values. Compiling a
+schema once into nested functions turns both walks into a single pass that
+only visits the properties needing work.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Mapping
+
+# Converts a value, adding the paths of unknown properties found to a set.
+Converter = Callable[[object, set], object]
+
+
+def _types(schema: dict) -> set[str]:
+    types = schema.get("type", ())
+    return {types} if isinstance(types, str) else set(types)
+
+
+def _conform_boolean(value, unmapped: set):
+    return None if value is None else value != 0
+
+
+def _conform_number(value, unmapped: set):
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    return value
+
+
+def _compile_value(
+    schema: dict, mask: Mapping | None, breadcrumb: tuple, path: str
+) -> Converter | None:
+    """Compile the converter of a property, or None if values pass as is."""
+    types = _types(schema)
+    if "object" in types and "properties" in schema:
+        conform_object = compile_conformer(schema, mask, breadcrumb, path)
+
+        def conform_value(value, unmapped: set):
+            if isinstance(value, dict):
+                return conform_object(value, unmapped)
+            return value
+
+        return conform_value
+    if "array" in types and isinstance(schema.get("items"), dict):
+        # The SDK does not apply property selection inside arrays.
+        conform_item = _compile_value(schema["items"], None, (), path)
+        if conform_item is None:
+            return None
+
+        def conform_array(value, unmapped: set):
+            if isinstance(value, list):
+                return [conform_item(item, unmapped) for item in value]
+            return value
+
+        return conform_array
+    if types - {"null"} == {"boolean"}:
+        return _conform_boolean
+    if types & {"integer", "number"}:
+        return _conform_number
+    return None
+
+
+def compile_conformer(
+    schema: dict,
+    mask: Mapping | None = None,
+    breadcrumb: tuple = (),
+    path: str = "",
+) -> Callable[[dict, set], dict]:
+    """Compile an object schema into a function conforming records to it.
+
+    The function returns a copy of a record without its deselected properties,
+    per the selection ``mask``, and without properties missing from the schema,
+    whose paths it adds to the given set. Values are coerced as the SDK does.
+    """
+    converters: dict[str, Converter | None] = {}
+    deselected = set()
+    for name, property_schema in schema.get("properties", {}).items():
+        property_breadcrumb = (*breadcrumb, "properties", name)
+        if mask is not None and not mask[property_breadcrumb]:
+            deselected.add(name)
+            continue
+        converters[name] = _compile_value(
+            property_schema, mask, property_breadcrumb, f"{path}{name}."
+        )
+    additional_properties = bool(schema.get("additionalProperties"))
+
+    def conform(record: dict, unmapped: set) -> dict:
+        output = {}
+        for name, value in record.items():
+            if name in converters:
+                convert = converters[name]
+                output[name] = value if convert is None else convert(value, unmapped)
+            elif name in deselected:
+                continue
+            elif additional_properties:
+                output[name] = value
+            else:
+                unmapped.add(path + name)
+        return output
+
+    return conform
@@ -0,0 +1,169 @@
+"""Request and record metrics per Slack API method and channel."""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Upper bounds in seconds of the request latency histogram buckets, with a
+# last bucket for slower requests.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass
+class EndpointMetrics:
+    """Counters of the calls to one API method, for one channel or overall."""
+
+    requests: int = 0
+    throttled: int = 0
+    bytes_received: int = 0
+    request_seconds: float = 0.0
+    sleep_seconds: float = 0.0
+    records: int = 0
+    latency_histogram: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+
+    def add_request(self, seconds: float, size: int, throttled: bool) -> None:
+        self.requests += 1
+        self.throttled += throttled
+        self.bytes_received += size
+        self.request_seconds += seconds
+        self.latency_histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def as_dict(self) -> dict:
+        labels = [f"<={bound:g}s" for bound in LATENCY_BUCKETS]
+        labels.append(f">{LATENCY_BUCKETS[-1]:g}s")
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "bytes_received": self.bytes_received,
+            "request_seconds": round(self.request_seconds, 3),
+            "sleep_seconds": round(self.sleep_seconds, 3),
+            "records": self.records,
+            "latency_histogram": dict(zip(labels, self.latency_histogram)),
+        }
+
+
+class SyncMetrics:
+    """Thread-safe metrics of a sync, keyed by API method and channel.
+
+    Channels are keyed by team as well, as channel ids may repeat across the
+    workspaces of a sync. Every `log_interval` seconds, the totals per method are logged as one JSON
+    line each, so that long syncs can be followed while they run.
+    """
+
+    def __init__(self, logger: logging.Logger, log_interval: float = 60) -> None:
+        self.logger = logger
+        self.log_interval = log_interval
+        self.started_at = time.monotonic()
+        self._logged_at = self.started_at
+        self._lock = threading.Lock()
+        self._methods: dict[str, EndpointMetrics] = defaultdict(EndpointMetrics)
+        self._channels: dict[tuple, dict[str, EndpointMetrics]] = defaultdict(
+            lambda: defaultdict(EndpointMetrics)
+        )
+
+    def _endpoints(self, method: str, channel_id: str | None, team_id: str | None):
+        yield self._methods[method]
+        if channel_id:
+            yield self._channels[team_id, channel_id][method]
+
+    def request(
+        self,
+        method: str,
+        channel_id: str | None,
+        seconds: float,
+        size: int,
+        *,
+        throttled: bool = False,
+        team_id: str | None = None,
+    ) -> None:
+        """Record a request, its duration and the size of its response."""
+        with self._lock:
+            for endpoint in self._endpoints(method, channel_id, team_id):
+                endpoint.add_request(seconds, size, throttled)
+        self._log_if_due()
+
+    def slept(
+        self,
+        method: str,
+        channel_id: str | None,
+        seconds: float,
+        *,
+        team_id: str | None = None,
+    ) -> None:
+        """Record time spent waiting on the rate limiter before a request."""
+        with self._lock:
+            for endpoint in self._endpoints(method, channel_id, team_id):
+                endpoint.sleep_seconds += seconds
+
+    def emitted(
+        self,
+        method: str,
+        channel_id: str | None,
+        records: int = 1,
+        *,
+        team_id: str | None = None,
+    ) -> None:
+        """Record records emitted from the responses of an API method."""
+        with self._lock:
+            for endpoint in self._endpoints(method, channel_id, team_id):
+                endpoint.records += records
+
+    def summary(self) -> dict:
+        """Return all metrics, per method and per channel and method. The
+        channels of the workspaces listed under `workspaces` are summarized
+        per team under "teams"."""
+        with self._lock:
+            channels: dict[str | None, dict] = defaultdict(dict)
+            for (team_id, channel_id), methods in sorted(
+                self._channels.items(), key=lambda item: (item[0][0] or "", item[0][1])
+            ):
+                channels[team_id][channel_id] = {
+                    method: endpoint.as_dict()
+                    for method, endpoint in sorted(methods.items())
+                }
+            summary = {
+                "elapsed_seconds": round(time.monotonic() - self.started_at, 3),
+                "methods": {
+                    method: endpoint.as_dict()
+                    for method, endpoint in sorted(self._methods.items())
+                },
+                "channels": channels.pop(None, {}),
+            }
+            if channels:
+                summary["teams"] = {
+                    team_id: {"channels": team_channels}
+                    for team_id, team_channels in channels.items()
+                }
+            return summary
+
+    def log(self) -> None:
+        """Log the totals of each method as a JSON line."""
+        summary = self.summary()
+        for method, metrics in summary["methods"].items():
+            line = {
+                "method": method,
+                "elapsed_seconds": summary["elapsed_seconds"],
+                **metrics,
+            }
+            self.logger.info("SLACK_METRIC: %s", json.dumps(line))
+
+    def _log_if_due(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if not self.log_interval or now - self._logged_at < self.log_interval:
+                return
+            self._logged_at = now
+        self.log()
+
+    def write_summary(self, path: str) -> None:
+        """Write the summary of all metrics to a JSON file."""
+        Path(path).write_text(json.dumps(self.summary(), indent=2))
@@ -0,0 +1,90 @@
+"""Adaptive page sizes for the paginated Slack API methods."""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+
+# The largest `limit` requested, as Slack takes limits under 1000. Slack
+# recommends smaller pages for the methods listing a workspace, but returning
+# fewer records than asked for costs nothing, while every request costs a
+# rate limit token. See https://api.slack.com/docs/pagination
+MAX_LIMIT = 999
+MIN_LIMIT = 20
+
+# Weight of the latest page in the moving averages.
+SMOOTHING = 0.3
+
+
+@dataclass
+class PageStats:
+    """Moving averages of the pages of one method, for one channel or overall."""
+
+    bytes_per_record: float | None = None
+    seconds_per_record: float | None = None
+
+    def observe(self, records: int, size: int, seconds: float, has_more: bool) -> None:
+        if not records:
+            return
+        self.bytes_per_record = _smooth(self.bytes_per_record, size / records)
+        # The latency of a last page, often short, is mostly fixed overhead.
+        if has_more:
+            self.seconds_per_record = _smooth(
+                self.seconds_per_record, seconds / records
+            )
+
+
+def _smooth(average: float | None, value: float) -> float:
+    if average is None:
+        return value
+    return average + SMOOTHING * (value - average)
+
+
+class PageSizer:
+    """Picks the `limit` of each request from the pages fetched so far.
+
+    Every request costs one rate limit token however many records it returns,
+    so the largest page Slack serves makes the most of the rate limits. Pages
+    are kept below ``max_page_bytes`` and ``max_page_seconds`` by the measured
+    size and latency per record, which vary a lot with the content of a
+    channel. A channel without pages yet starts from the method's overall
+    averages. Slack may return fewer records than asked for, which costs
+    nothing, so limits are not lowered for short pages.
+    """
+
+    def __init__(self, max_page_bytes: float, max_page_seconds: float) -> None:
+        self.max_page_bytes = max_page_bytes
+        self.max_page_seconds = max_page_seconds
+        self._stats: dict[tuple, PageStats] = {}
+        self._lock = threading.Lock()
+
+    def limit(self, method: str, key: tuple = (), initial: int = 200) -> int:
+        """Return the page size to request from a method for a key, such as a
+        channel, or ``initial`` before any page of the method, up to
+        ``MAX_LIMIT``."""
+        with self._lock:
+            stats = self._stats.get((method, *key)) or self._stats.get((method,))
+            if stats is None:
+                return min(initial, MAX_LIMIT)
+            limit = MAX_LIMIT
+            if stats.bytes_per_record:
+                limit = min(limit, self.max_page_bytes / stats.bytes_per_record)
+            if stats.seconds_per_record:
+                limit = min(limit, self.max_page_seconds / stats.seconds_per_record)
+        return max(MIN_LIMIT, int(limit))
+
+    def observe(
+        self,
+        method: str,
+        key: tuple,
+        records: int,
+        size: int,
+        seconds: float,
+        has_more: bool,
+    ) -> None:
+        """Record the records, bytes and latency of a page, and whether more
+        pages follow it."""
+        with self._lock:
+            for stats_key in {(method,), (method, *key)}:
+                stats = self._stats.setdefault(stats_key, PageStats())
+                stats.observe(records, size, seconds, has_more)
@@ -0,0 +1,84 @@
+"""Settings of a sync run, parsed from the tap config once at startup."""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+import sys
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+if sys.version_info < (3, 11):
+    from backports.datetime_fromisoformat import MonkeyPatch
+
+    MonkeyPatch.patch_fromisoformat()
+
+
+def compile_globs(patterns: Iterable[str] | None) -> re.Pattern | None:
+    """Compile glob patterns into one regex matching any of them."""
+    patterns = list(patterns or ())
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+@dataclass(frozen=True)
+class SyncPlan:
+    """Channel filters and cutoffs that stay fixed for the whole run.
+
+    Building the plan once keeps per-record checks to set lookups, and pins
+    the thread lookback cutoff to the start of the run, so it does not drift
+    during a long sync.
+    """
+
+    selected_channels: frozenset[str]
+    excluded_channels: frozenset[str]
+    selected_channel_patterns: re.Pattern | None
+    excluded_channel_patterns: re.Pattern | None
+    # Unix timestamps; start_timestamp is None without a start_date.
+    started_at: float
+    start_timestamp: float | None
+    thread_lookback_start: float
+
+    @classmethod
+    def from_config(cls, config: Mapping, now: float | None = None) -> SyncPlan:
+        """Build the plan of a run starting at `now`."""
+        now = time.time() if now is None else now
+        start_timestamp = None
+        if config.get("start_date"):
+            start_date = datetime.fromisoformat(config["start_date"])
+            start_timestamp = start_date.replace(tzinfo=timezone.utc).timestamp()
+        return cls(
+            selected_channels=frozenset(config.get("selected_channels") or ()),
+            excluded_channels=frozenset(config.get("excluded_channels") or ()),
+            selected_channel_patterns=compile_globs(
+                config.get("selected_channel_patterns")
+            ),
+            excluded_channel_patterns=compile_globs(
+                config.get("excluded_channel_patterns")
+            ),
+            started_at=now,
+            start_timestamp=start_timestamp,
+            thread_lookback_start=now - config["thread_lookback_days"] * 86400,
+        )
+
+    def includes_channel(self, channel_id: str, name: str | None = None) -> bool:
+        """Whether a channel is to be synced.
+
+        Channels are included when selected by id or name pattern, or when no
+        selection is configured, unless excluded by id or name pattern.
+        """
+        name = name or ""
+        if channel_id in self.excluded_channels or (
+            self.excluded_channel_patterns
+            and self.excluded_channel_patterns.match(name)
+        ):
+            return False
+        if not self.selected_channels and not self.selected_channel_patterns:
+            return True
+        return channel_id in self.selected_channels or bool(
+            self.selected_channel_patterns
+            and self.selected_channel_patterns.match(name)
+        )
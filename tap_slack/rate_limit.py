@@ -0,0 +1,166 @@
+"""Per-method rate limiting for the Slack Web API."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
+
+# Requests per minute allowed by each of Slack's rate limit tiers.
+# See https://api.slack.com/docs/rate-limits
+TIER_REQUESTS_PER_MINUTE = {
+    1: 1,
+    2: 20,
+    3: 50,
+    4: 100,
+}
+
+# The rate limit tier of each Slack API method called by the tap.
+METHOD_TIERS = {
+    "conversations.history": 3,
+    "conversations.join": 3,
+    "conversations.list": 2,
+    "conversations.members": 4,
+    "conversations.replies": 3,
+    "users.list": 2,
+}
+DEFAULT_TIER = 3
+
+# Adaptive rate control: halve a method's rate whenever Slack throttles it,
+# then win back a tenth of the tier rate after each run of successful calls.
+THROTTLE_RATE_FACTOR = 0.5
+MIN_RATE_FACTOR = 0.1
+RECOVERY_STREAK = 25
+RECOVERY_RATE_FACTOR = 0.1
+
+
+class TokenBucket:
+    """A thread-safe token bucket refilled at a constant rate.
+
+    Callers that find the bucket empty reserve a future token and sleep only
+    until that token becomes available, so time already spent waiting on the
+    network counts towards the next request.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int | None = None) -> None:
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst or max(1, int(requests_per_minute // 10))
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def requests_per_minute(self) -> float:
+        """Return the current refill rate in requests per minute."""
+        return self.rate * 60.0
+
+    def set_rate(self, requests_per_minute: float) -> None:
+        """Change the refill rate, keeping tokens accrued at the old rate."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = requests_per_minute / 60.0
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for the given number of seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Requests made during the pause resume with a single token, and
+            # no tokens accrue until the pause ends, so they are spaced at
+            # the refill rate rather than sent as a burst.
+            self._tokens = min(self._tokens, 1.0)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._updated_at = max(self._updated_at, self._paused_until)
+
+    def _refill(self, now: float) -> None:
+        if now <= self._updated_at:
+            return
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def reserve(self) -> float:
+        """Take a token and return the number of seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(max(now, self._paused_until))
+            self._tokens -= 1
+            pause = max(0.0, self._paused_until - now)
+            if self._tokens >= 0:
+                return pause
+            return pause + -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Block until a token is available, returning the time spent waiting."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """Token buckets for each Slack API method, shared by all streams of a tap.
+
+    The rate of each method adapts to Slack's responses: a throttled call
+    pauses the method's bucket for the ``Retry-After`` period and lowers its
+    rate, which then recovers gradually towards the tier rate.
+    """
+
+    def __init__(self, overrides: Mapping[str, float] | None = None) -> None:
+        self._overrides = dict(overrides or {})
+        self._buckets: dict[str, TokenBucket] = {}
+        self._streaks: Counter[str] = Counter()
+        self.throttle_counts: Counter[str] = Counter()
+        self.sleep_seconds: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def requests_per_minute(self, method: str) -> float:
+        """Return the configured request rate for an API method."""
+        if method in self._overrides:
+            return float(self._overrides[method])
+        return TIER_REQUESTS_PER_MINUTE[METHOD_TIERS.get(method, DEFAULT_TIER)]
+
+    def bucket(self, method: str) -> TokenBucket:
+        """Return the token bucket for an API method, creating it on first use."""
+        with self._lock:
+            if method not in self._buckets:
+                self._buckets[method] = TokenBucket(self.requests_per_minute(method))
+            return self._buckets[method]
+
+    def acquire(self, method: str) -> float:
+        """Wait for permission to call an API method."""
+        wait = self.bucket(method).acquire()
+        if wait:
+            with self._lock:
+                self.sleep_seconds[method] += wait
+        return wait
+
+    def throttled(self, method: str, retry_after: float) -> None:
+        """Record that Slack rate limited an API method."""
+        bucket = self.bucket(method)
+        bucket.pause(retry_after)
+        limit = self.requests_per_minute(method)
+        with self._lock:
+            self.throttle_counts[method] += 1
+            self._streaks[method] = 0
+            rate = max(
+                limit * MIN_RATE_FACTOR,
+                bucket.requests_per_minute * THROTTLE_RATE_FACTOR,
+            )
+        bucket.set_rate(rate)
+
+    def succeeded(self, method: str) -> None:
+        """Record a successful call, raising a reduced rate after a streak."""
+        bucket = self.bucket(method)
+        limit = self.requests_per_minute(method)
+        with self._lock:
+            if bucket.requests_per_minute >= limit:
+                return
+            self._streaks[method] += 1
+            if self._streaks[method] < RECOVERY_STREAK:
+                return
+            self._streaks[method] = 0
+            rate = min(limit, bucket.requests_per_minute + limit * RECOVERY_RATE_FACTOR)
+        bucket.set_rate(rate)
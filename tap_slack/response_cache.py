@@ -0,0 +1,148 @@
+"""An on-disk cache of Slack API responses, for repeating syncs offline."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_MODES = ("off", "record", "replay", "ttl")
+# Query parameters left out of cache keys. The page size only changes where a
+# chain of pages is split, and the cursors of cached pages lead to cached pages.
+UNKEYED_PARAMS = frozenset({"limit"})
+
+
+class ResponseCache:
+    """Successful Slack API responses stored in a SQLite database.
+
+    Responses are keyed by workspace, API method and query parameters, cursor
+    included. In ``record`` mode every request is sent to Slack and its
+    response stored. In ``replay`` mode responses are only served from the
+    cache. In ``ttl`` mode responses stored less than ``ttl_seconds`` ago are
+    served from the cache, and the others are requested and stored.
+
+    Requests depend on the start time of the run, such as the `latest` bound
+    of message history, so the cache also keeps the start time of the run that
+    recorded it, for replays to make the same requests.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        mode: str = "record",
+        ttl_seconds: float | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.stored = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                stored_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                started_at REAL NOT NULL
+            );
+            """
+        )
+
+    @property
+    def replay_only(self) -> bool:
+        """Whether requests missing from the cache fail rather than go to Slack."""
+        return self.mode == "replay"
+
+    def start_run(self, now: float) -> float:
+        """Return the start time of a run starting at `now`.
+
+        Replays, and runs within the TTL of the recorded run in ``ttl`` mode,
+        start when the recorded run did. Other runs are recorded as starting
+        at `now`.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT started_at FROM runs ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+            if row and (
+                self.mode == "replay"
+                or (self.mode == "ttl" and now - row[0] < self.ttl_seconds)
+            ):
+                return row[0]
+            if self.mode != "replay":
+                self._connection.execute("DELETE FROM runs")
+                self._connection.execute("INSERT INTO runs VALUES (?)", (now,))
+        return now
+
+    @staticmethod
+    def key(team_id: str | None, request: requests.PreparedRequest) -> str:
+        """Return the cache key of a request to a workspace."""
+        url = urlsplit(request.url)
+        params = sorted(
+            (name, value)
+            for name, value in parse_qsl(url.query)
+            if name not in UNKEYED_PARAMS
+        )
+        return json.dumps([team_id, url.path.rsplit("/", 1)[-1], params])
+
+    def get(
+        self, key: str, request: requests.PreparedRequest
+    ) -> requests.Response | None:
+        """Return the cached response of a request, if the mode serves one."""
+        if self.mode == "record":
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status_code, headers, content, stored_at FROM responses "
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        status_code, headers, content, stored_at = row
+        if self.mode == "ttl" and time.time() - stored_at >= self.ttl_seconds:
+            return None
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response._content = content
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        with self._lock:
+            self.hits += 1
+        return response
+
+    def put(self, key: str, response: requests.Response) -> None:
+        """Store the response of a request, unless replaying."""
+        if self.replay_only:
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    response.status_code,
+                    json.dumps(dict(response.headers)),
+                    response.content,
+                    time.time(),
+                ),
+            )
+            self.stored += 1
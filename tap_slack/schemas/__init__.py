@@ -1,13 +1,28 @@
-from tap_slack.schemas.channels import schema as channels
-from tap_slack.schemas.channel_members import schema as channel_members
-from tap_slack.schemas.messages import schema as messages
-from tap_slack.schemas.threads import schema as threads
-from tap_slack.schemas.users import schema as users
-
-__all__ = [
-    "channels",
-    "channel_members",
-    "messages",
-    "threads",
-    "users",
-]
+"""Stream schemas, each defined as `schema` in a module named after its stream.
+
+Schema modules are only imported when a stream first reads its schema, so that
+starting the tap does not build the schemas of streams it does not sync.
+"""
+
+from __future__ import annotations
+
+import importlib
+
+from singer_sdk.schema.source import SchemaSource, StreamSchema
+
+__all__ = ["SchemaModules", "stream_schema"]
+
+
+class SchemaModules(SchemaSource):
+    """Schemas read from the `schema` attribute of a package's modules."""
+
+    def __init__(self, package: str) -> None:
+        super().__init__()
+        self.package = package
+
+    def fetch_schema(self, key: str) -> dict:
+        """Import the schema module of a stream."""
+        return importlib.import_module(f"{self.package}.{key}").schema
+
+
+stream_schema = StreamSchema(SchemaModules(__name__))
@@ -1,6 +1,7 @@
 from singer_sdk import typing as th
 
 schema = th.PropertiesList(
+    th.Property("team_id", th.StringType),
     th.Property("channel_id", th.StringType, required=True),
     th.Property(
         "ts",
@@ -0,0 +1,94 @@
+"""Stream state lookups and STATE message pacing for many channel partitions."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+from singer_sdk.streams._state import StreamStateManager
+
+from tap_slack.concurrency import context_key
+
+
+class IndexedStateManager(StreamStateManager):
+    """Stream state manager finding partition states through a dict index.
+
+    The SDK scans the stream's list of partition states for every lookup,
+    which adds up with thousands of channels. The list stays the state's
+    format, and the index is rebuilt whenever the list is replaced or changes
+    size outside of this manager.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._partitions: list[dict] | None = None
+        self._index: dict[tuple, dict] = {}
+
+    def _reindex(self, partitions: list[dict]) -> None:
+        index = {}
+        for partition in partitions:
+            key = context_key(partition["context"])
+            if key in index:
+                msg = (
+                    "State file contains duplicate entries for partition: "
+                    f"{partition['context']}."
+                )
+                raise ValueError(msg)
+            index[key] = partition
+        self._partitions = partitions
+        self._index = index
+
+    def get_context_state(self, context: dict | None) -> dict:
+        """Return the writable state of a context, creating it if needed."""
+        partition_context = self.get_state_partition_context(context)
+        if not partition_context:
+            return self.stream_state
+        partitions = self.stream_state.setdefault("partitions", [])
+        if partitions is not self._partitions or len(partitions) != len(self._index):
+            self._reindex(partitions)
+        key = context_key(partition_context)
+        state = self._index.get(key)
+        if state is None:
+            state = self._index[key] = {"context": dict(partition_context)}
+            partitions.append(state)
+        return state
+
+    def prune(self, drop: Callable[[dict], bool]) -> int:
+        """Remove the partition states whose context is dropped, returning
+        how many were removed."""
+        partitions = self.stream_state.get("partitions")
+        if not partitions:
+            return 0
+        kept = [partition for partition in partitions if not drop(partition["context"])]
+        removed = len(partitions) - len(kept)
+        if removed:
+            partitions[:] = kept
+            self._reindex(partitions)
+            self.is_flushed = False
+        return removed
+
+
+class StateMessageThrottle:
+    """Spaces out the STATE messages of a tap.
+
+    Every STATE message holds the state of the whole tap, which grows with
+    the number of channels, so writing one after each channel partition makes
+    the output grow with the square of the number of channels. Messages
+    requested less than ``interval`` seconds after the last one are skipped,
+    as the next message holds their state too.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._written_at: float | None = None
+
+    def due(self) -> bool:
+        """Whether a STATE message may be written now."""
+        return (
+            self._written_at is None
+            or time.monotonic() - self._written_at >= self.interval
+        )
+
+    def written(self) -> None:
+        """Record that a STATE message was written."""
+        self._written_at = time.monotonic()
@@ -2,32 +2,394 @@
 
 from __future__ import annotations
 
+import json
 import requests
-import sys
 import time
+import zlib
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import zip_longest
+from http import HTTPStatus
+from typing import TYPE_CHECKING, NamedTuple
+from singer_sdk.batch import Batcher
+from singer_sdk.exceptions import (
+    AbortedSyncFailedException,
+    AbortedSyncPausedException,
+    RetriableAPIError,
+)
+
+from tap_slack.client import (
+    DEFAULT_RETRY_AFTER,
+    SlackInvalidCursorError,
+    SlackStream,
+    next_cursor,
+    response_json,
+)
+from tap_slack.concurrency import Prefetcher, context_key
+from tap_slack import schemas
 
-from datetime import datetime, timezone, timedelta
-from singer_sdk.helpers.jsonpath import extract_jsonpath
+if TYPE_CHECKING:
+    from singer_sdk.helpers._batch import BatchConfig
+
+
+class BackfillWindow(NamedTuple):
+    """Marks the end of a backfill window's records in a record stream."""
+
+    oldest: float
+    latest: float
+
+
+class PageMarker(NamedTuple):
+    """Marks the end of a page's records in a record stream."""
+
+    next_cursor: str | None
+    # The time range of the page's request chain.
+    oldest: float | None = None
+    latest: float | None = None
+
+
+def message_fingerprint(message: dict) -> str:
+    """Return a short hash of the message fields that change after posting."""
+    fields = [
+        (message.get("edited") or {}).get("ts"),
+        message.get("reply_count"),
+        message.get("latest_reply"),
+        [
+            [reaction.get("name"), reaction.get("count")]
+            for reaction in message.get("reactions", ())
+        ],
+    ]
+    return f"{zlib.crc32(json.dumps(fields).encode()):08x}"
+
+
+# The fingerprint of a message that was never edited, replied to or reacted to.
+PLAIN_FINGERPRINT = message_fingerprint({})
+
+# The attempts to join a channel while Slack rate limits conversations.join.
+MAX_JOIN_ATTEMPTS = 5
+
+
+def split_windows(start: float, end: float, width: float) -> list[list[float]]:
+    """Split a time range into [oldest, latest] windows, newest first."""
+    windows = []
+    latest = end
+    while latest > start:
+        oldest = max(start, latest - width)
+        windows.append([oldest, latest])
+        latest = oldest
+    return windows
 
-from tap_slack.client import SlackStream
-from tap_slack import schemas
 
-if sys.version_info < (3, 11):
-    from backports.datetime_fromisoformat import MonkeyPatch
+@dataclass
+class ChannelListing:
+    """The channels listed in a workspace, until their child streams are synced."""
 
-    MonkeyPatch.patch_fromisoformat()
+    context: dict | None
+    state: dict
+    # Channel fingerprints and child streams of the previous run.
+    previous_fingerprints: dict[str, list]
+    previous_child_streams: list[str]
+    fingerprints: dict[str, list] = field(default_factory=dict)
+    child_contexts: list[dict] = field(default_factory=list)
+    # Channels to join once listed, and those left unjoined this run.
+    pending_joins: list[str] = field(default_factory=list)
+    unjoined: set[str] = field(default_factory=set)
+    # Channels for which a child sync failed.
+    failed: set[str] = field(default_factory=set)
 
 
 class ChannelsStream(SlackStream):
     name = "channels"
     path = "/conversations.list"
     primary_keys = ["id"]
-    records_jsonpath = "channels.[*]"
-    schema = schemas.channels
+    records_key = "channels"
+    schema = schemas.stream_schema
+
+    # Records buffered per channel partition while it waits to be synced.
+    max_buffered_records = 10_000
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # The listing of the workspace being listed, and of those listed before
+        # it whose child streams are not synced yet.
+        self._listing: ChannelListing | None = None
+        self._listings: list[ChannelListing] = []
+
+    @property
+    def partitions(self) -> list[dict] | None:
+        """List the channels of each workspace when syncing several."""
+        return self._tap.workspace_partitions
+
+    @staticmethod
+    def fingerprint(row: dict) -> list:
+        """Return the channel fields whose change calls for a child sync."""
+        latest = row.get("latest") or {}
+        return [
+            row.get("updated"),
+            row.get("num_members"),
+            row.get("is_archived"),
+            latest.get("ts"),
+        ]
 
     def get_child_context(self, record, context):
         """Return context dictionary for child stream."""
-        return {"channel_id": record["id"]}
+        return {**(context or {}), "channel_id": record["id"]}
+
+    def generate_child_contexts(self, record, context):
+        """Child contexts are collected by `post_process`, including those of
+        unchanged channels that are not emitted."""
+        return ()
+
+    def get_records(self, context):
+        """
+        Read the channel list of a workspace. Once every workspace is listed,
+        sync the child streams of their channels together, so that the
+        workspaces are synced concurrently.
+        """
+        state = self.get_context_state(context)
+        self._listing = ChannelListing(
+            context,
+            state,
+            previous_fingerprints=state.get("channel_fingerprints", {}),
+            previous_child_streams=state.get("child_streams", []),
+        )
+        yield from super().get_records(context)
+        self._prune_child_states(self._listing)
+        self._join_channels(self._listing)
+        self._listings.append(self._listing)
+        if len(self._listings) < len(self.partitions or [None]):
+            return
+        listings, self._listings = self._listings, []
+        self._sync_child_partitions(listings)
+        child_streams = sorted(stream.name for stream in self._synced_child_streams())
+        for listing in listings:
+            # Channels whose child syncs failed keep their previous fingerprint,
+            # if any, so that they are synced again on the next run.
+            for channel_id in listing.failed:
+                if channel_id in listing.previous_fingerprints:
+                    listing.fingerprints[channel_id] = listing.previous_fingerprints[
+                        channel_id
+                    ]
+                else:
+                    listing.fingerprints.pop(channel_id, None)
+            listing.state["channel_fingerprints"] = listing.fingerprints
+            listing.state["child_streams"] = child_streams
+
+    def _join_channels(self, listing: ChannelListing) -> None:
+        """
+        Join the listed channels the bot is not a member of, up to
+        `auto_join_workers` at once. Failures are kept in state with Slack's
+        error, and the channel is not tried again for `auto_join_retry_hours`.
+        Channels that could not be joined for other reasons, such as network
+        errors, are skipped for this run only.
+        """
+        pending = listing.pending_joins
+        failures = listing.state.pop("join_failures", {})
+        now = self._tap.sync_plan.started_at
+        retry_seconds = self.config["auto_join_retry_hours"] * 3600
+        listing.unjoined = {
+            channel_id
+            for channel_id in pending
+            if now - failures.get(channel_id, {}).get("failed_at", 0) < retry_seconds
+        }
+        to_join = [
+            channel_id for channel_id in pending if channel_id not in listing.unjoined
+        ]
+        # Failures of channels that were since joined or dropped are forgotten.
+        failures = {channel_id: failures[channel_id] for channel_id in listing.unjoined}
+        with ThreadPoolExecutor(self.config["auto_join_workers"]) as executor:
+            join = partial(self._join_channel, listing.context)
+            futures = [executor.submit(join, channel_id) for channel_id in to_join]
+            for channel_id, future in zip(to_join, futures):
+                try:
+                    error = future.result()
+                except RetriableAPIError as ex:
+                    self.logger.warning(
+                        "Could not join channel %s, retrying on the next run: %s",
+                        channel_id,
+                        ex,
+                    )
+                    listing.unjoined.add(channel_id)
+                    continue
+                if error is None:
+                    continue
+                self.logger.warning("Error joining channel %s: %s", channel_id, error)
+                failures[channel_id] = {"error": error, "failed_at": now}
+                listing.unjoined.add(channel_id)
+        if failures:
+            listing.state["join_failures"] = failures
+        if pending:
+            self.logger.info(
+                "Joined %d channels, skipping the messages of %d unjoined channels",
+                len(pending) - len(listing.unjoined),
+                len(listing.unjoined),
+            )
+
+    def _join_channel(self, context: dict | None, channel_id: str) -> str | None:
+        """
+        Join a channel, returning Slack's error if it could not be joined.
+
+        Raises RetriableAPIError when the request fails without an error from
+        Slack, or is still rate limited after `MAX_JOIN_ATTEMPTS` attempts.
+        """
+        cache = self._tap.response_cache
+        if cache is not None and cache.replay_only:
+            # The channel was joined when its messages were recorded.
+            return None
+        method = "conversations.join"
+        rate_limiter = self.rate_limiter(context)
+        metrics = self._tap.metrics
+        team_id = (context or {}).get("team_id")
+        for attempt in range(1, MAX_JOIN_ATTEMPTS + 1):
+            waited = rate_limiter.acquire(method)
+            if waited:
+                metrics.slept(method, channel_id, waited, team_id=team_id)
+            started = time.perf_counter()
+            try:
+                response = self.requests_session.post(
+                    url=f"{self.url_base}/{method}",
+                    params={"channel": channel_id},
+                    headers=self.auth_headers(context),
+                    timeout=self.timeout,
+                )
+                body = response_json(response)
+            except (requests.RequestException, ValueError) as ex:
+                metrics.request(
+                    method,
+                    channel_id,
+                    time.perf_counter() - started,
+                    0,
+                    team_id=team_id,
+                )
+                raise RetriableAPIError(str(ex)) from ex
+            throttled = (
+                response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+                or body.get("error") == "ratelimited"
+            )
+            metrics.request(
+                method,
+                channel_id,
+                time.perf_counter() - started,
+                len(response.content),
+                throttled=throttled,
+                team_id=team_id,
+            )
+            if not throttled:
+                break
+            retry_after = response.headers.get("Retry-After", DEFAULT_RETRY_AFTER)
+            rate_limiter.throttled(method, float(retry_after))
+        else:
+            msg = f"Still rate limited after {attempt} attempts"
+            raise RetriableAPIError(msg, response)
+        if not body.get("ok"):
+            if body.get("error"):
+                return body["error"]
+            msg = f"HTTP {response.status_code} without a Slack error"
+            raise RetriableAPIError(msg, response)
+        rate_limiter.succeeded(method)
+        return None
+
+    def _prune_child_states(self, listing: ChannelListing) -> None:
+        """
+        Drop the child stream states of the workspace's channels that were not
+        listed, as they were deleted, or that are excluded from the sync, so
+        that the state only grows with the channels being synced.
+        """
+        team_id = (listing.context or {}).get("team_id")
+
+        def is_dropped(context: dict) -> bool:
+            return (
+                context.get("team_id") == team_id
+                and context.get("channel_id") not in listing.fingerprints
+            )
+
+        for stream in self.child_streams:
+            pruned = stream.state_manager.prune(is_dropped)
+            if pruned:
+                self.logger.info(
+                    "Dropped the %s state of %d unlisted or excluded channels",
+                    stream.name,
+                    pruned,
+                )
+
+    def _sync_child_partitions(self, listings: list[ChannelListing]) -> None:
+        """
+        Sync the child streams for each channel, fetching the records of up to
+        `channel_workers` channel partitions per workspace at once. Partitions
+        are synced in the order their fetches complete, so a large channel does
+        not hold up the small channels behind it, and the partitions of the
+        workspaces are interleaved, so that each workspace has requests under
+        way within its own rate limits.
+
+        The channels for which a child sync failed are added to the `failed`
+        set of their listing.
+        """
+        child_streams = self._synced_child_streams()
+        workspace_jobs = [
+            [
+                (listing, stream, context)
+                for context in listing.child_contexts
+                for stream in child_streams
+                if not self._skip_child_sync(listing, stream, context["channel_id"])
+            ]
+            for listing in listings
+        ]
+        pending = deque(
+            job for jobs in zip_longest(*workspace_jobs) for job in jobs if job
+        )
+        prefetcher = Prefetcher(
+            self.config["channel_workers"] * len(listings),
+            max_buffered=self.max_buffered_records,
+        )
+        try:
+            while pending or len(prefetcher):
+                while pending and len(prefetcher) < prefetcher.max_workers * 2:
+                    job = pending.popleft()
+                    _, stream, context = job
+                    prefetcher.submit(job, stream.prefetch(context))
+                (listing, stream, context), records = prefetcher.pop_ready(block=True)
+                try:
+                    stream.sync_prefetched(context, records)
+                except (AbortedSyncFailedException, AbortedSyncPausedException):
+                    # Release the worker, which may be blocked on a full buffer.
+                    records.cancel()
+                    listing.failed.add(context["channel_id"])
+                    continue
+        finally:
+            prefetcher.close()
+
+    def _synced_child_streams(self) -> list[SlackStream]:
+        return [
+            stream
+            for stream in self.child_streams
+            if stream.selected or stream.has_selected_descendents
+        ]
+
+    def _skip_child_sync(
+        self, listing: ChannelListing, stream: SlackStream, channel_id: str
+    ) -> bool:
+        """
+        Skip the members of channels that did not change since the previous
+        run, and the messages of archived channels that were already archived
+        then, as archived channels get no new messages. The messages of
+        channels the bot could not join are skipped as well.
+        """
+        if isinstance(stream, MessagesStream) and channel_id in listing.unjoined:
+            return True
+        previous = listing.previous_fingerprints.get(channel_id)
+        if (
+            previous != listing.fingerprints[channel_id]
+            or stream.name not in listing.previous_child_streams
+        ):
+            return False
+        if isinstance(stream, ChannelMembersStream):
+            return True
+        is_archived = previous[2]
+        return isinstance(stream, MessagesStream) and is_archived
 
     def get_url_params(self, context, next_page_token):
         """Augment default to filter channel types to return and extract messages from."""
@@ -37,35 +399,23 @@ class ChannelsStream(SlackStream):
         return params
 
     def post_process(self, row, context):
-        "Join the channel if not a member, but emit no data."
+        """Queue the channel to be joined if not a member, and collect its child
+        context. Unchanged channels are only emitted with
+        `emit_unchanged_channels`."""
         row = super().post_process(row, context)
         # return all in selected_channels or default to all, exclude any in excluded_channels list
         channel_id = row["id"]
-        if self._is_channel_included(channel_id):
+        listing = self._listing
+        if self._tap.sync_plan.includes_channel(channel_id, row.get("name")):
             if not row["is_member"] and self.config.get("auto_join_channels", False):
-                self._join_channel(channel_id)
-            return row
-
-    def _is_channel_included(self, channel_id: str) -> bool:
-        selected_channels = self.config.get("selected_channels")
-        excluded_channels = self.config.get("excluded_channels", [])
-        if channel_id in excluded_channels:
-            return False
-        if selected_channels and channel_id not in selected_channels:
-            return False
-        return True
-
-    def _join_channel(self, channel_id: str) -> requests.Response:
-        url = f"{self.url_base}/conversations.join"
-        params = {"channel": channel_id}
-        response = self.requests_session.post(
-            url=url, params=params, headers=self.authenticator.auth_headers
-        )
-        if not response.json().get("ok"):
-            self.logger.warning(
-                "Error joining channel %s: %s", response.json().get("error")
-            )
-        self.logger.info("Successfully joined channel: %s", channel_id)
+                listing.pending_joins.append(channel_id)
+            listing.child_contexts.append(self.get_child_context(row, context))
+            fingerprint = listing.fingerprints[channel_id] = self.fingerprint(row)
+            if (
+                self.config["emit_unchanged_channels"]
+                or listing.previous_fingerprints.get(channel_id) != fingerprint
+            ):
+                return row
 
 
 class ChannelMembersStream(SlackStream):
@@ -73,15 +423,14 @@ class ChannelMembersStream(SlackStream):
     parent_stream_type = ChannelsStream
     path = "/conversations.members"
     primary_keys = ["channel_id", "member_id"]
-    records_jsonpath = "members.[*]"
-    schema = schemas.channel_members
+    records_key = "members"
+    schema = schemas.stream_schema
 
     ignore_parent_replication_keys = True
     state_partitioning_keys = []
 
     def parse_response(self, response):
-        user_list = extract_jsonpath(self.records_jsonpath, input=response.json())
-        yield from ({"member_id": ii} for ii in user_list)
+        yield from ({"member_id": ii} for ii in super().parse_response(response))
 
     def post_process(self, row, context=None):
         row = super().post_process(row, context=context)
@@ -95,41 +444,412 @@ class MessagesStream(SlackStream):
     path = "/conversations.history"
     primary_keys = ["channel_id", "ts"]
     replication_key = "ts"
-    records_jsonpath = "messages.[*]"
-    schema = schemas.messages
+    records_key = "messages"
+    schema = schemas.stream_schema
+    supports_batches = True
 
     ignore_parent_replication_key = True
-    max_requests_per_minute = 50
+
+    # Records buffered per backfill window while it waits to be synced.
+    max_buffered_records = 10_000
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._starting_timestamps: dict[tuple, float] = {}
+        self._backfill_windows: dict[tuple, list[list[float]]] = {}
+        self._request_chains: dict[tuple, list[dict]] = {}
+        # The emitted message index of the partition being synced, and the
+        # bookmark at or below which messages missing from it were emitted.
+        self._emitted_messages: dict[str, str] = {}
+        self._emitted_until = 0.0
+        # With `batch_config`, the messages and backfill windows synced since
+        # the last batch, which are only recorded in state once it is written.
+        self._unbatched_messages: dict[str, str] = {}
+        self._unbatched_windows: list[BackfillWindow] = []
 
     @property
-    def threads_stream_start(self):
-        lookback_days = timedelta(days=self.config["thread_lookback_days"])
-        start_date = datetime.now(tz=timezone.utc) - lookback_days
-        return start_date.timestamp()
+    def threads_stream_start(self) -> float:
+        """Return the thread lookback cutoff, fixed at the start of the run."""
+        return self._tap.sync_plan.thread_lookback_start
+
+    def prefetch(self, context):
+        """Read the starting timestamp from state before handing off to a worker."""
+        self._starting_timestamps[context_key(context)] = (
+            self.get_starting_replication_key_value(context)
+        )
+        self._plan_requests(context)
+        return super().prefetch(context)
+
+    def _starting_timestamp(self, context: dict | None) -> float:
+        """Return the partition's starting timestamp, read from state once."""
+        key = context_key(context)
+        start_timestamp = self._starting_timestamps.get(key)
+        if start_timestamp is None:
+            start_timestamp = self._starting_timestamps[key] = (
+                self.get_starting_replication_key_value(context)
+            )
+        return start_timestamp
+
+    def _plan_requests(self, context: dict | None) -> None:
+        """
+        Plan the request chains of a partition from its state: the windows of
+        a backfill, or else the rest of a chain interrupted at a checkpoint
+        followed by the time since, or else a single chain since the starting
+        timestamp. Every chain ends at the start of the run, so that a cursor
+        checkpoint resumes the exact same query.
+        """
+        if self._plan_backfill(context):
+            return
+        end = self._tap.sync_plan.started_at
+        checkpoint = self.get_context_state(context).get("cursor_checkpoint")
+        if checkpoint:
+            chains = [{"oldest": checkpoint["latest"], "latest": end}]
+            if checkpoint["cursor"]:
+                chains.insert(
+                    0,
+                    {
+                        "oldest": checkpoint["oldest"],
+                        "latest": checkpoint["latest"],
+                        "cursor": checkpoint["cursor"],
+                    },
+                )
+        else:
+            chains = [{"oldest": self._starting_timestamp(context), "latest": end}]
+        self._request_chains[context_key(context)] = chains
+
+    def _plan_backfill(self, context: dict | None) -> bool:
+        """
+        Split the partition's history into windows of `backfill_window_days`
+        when it spans more than one window, or resume the windows left over by
+        an interrupted backfill. Pending windows are kept in the partition's
+        state until their records are synced.
+        """
+        window_days = self.config.get("backfill_window_days")
+        if not window_days:
+            return False
+        width = window_days * 86400
+        end = self._tap.sync_plan.started_at
+        state = self.get_context_state(context)
+        windows = state.get("backfill_windows")
+        if windows is not None:
+            windows = [*windows, *split_windows(state["backfill_until"], end, width)]
+        else:
+            start = self._starting_timestamp(context)
+            if end - start <= width:
+                return False
+            windows = split_windows(start, end, width)
+        state["backfill_windows"] = windows
+        state["backfill_until"] = end
+        state.pop("cursor_checkpoint", None)
+        self._backfill_windows[context_key(context)] = list(windows)
+        return True
+
+    def request_records(self, context: dict | None) -> Iterator[dict]:
+        """
+        Fetch a planned backfill one window per request chain, with up to
+        `backfill_workers` windows at once. The records of each window are
+        followed by a `BackfillWindow` marker. Otherwise, request the planned
+        chains one after the other.
+        """
+        key = context_key(context)
+        windows = deque(self._backfill_windows.pop(key, ()))
+        if not windows:
+            chains = self._request_chains.pop(key, None)
+            if chains is None:
+                yield from super().request_records(context)
+            for chain in chains or ():
+                yield from self._request_chain({**context, **chain})
+            return
+        prefetcher = Prefetcher(
+            self.config["backfill_workers"], max_buffered=self.max_buffered_records
+        )
+        fetch_window = super().request_records
+        records = None
+        try:
+            while windows or len(prefetcher):
+                while windows and len(prefetcher) < prefetcher.max_workers:
+                    oldest, latest = windows.popleft()
+                    window_context = {**context, "oldest": oldest, "latest": latest}
+                    prefetcher.submit(
+                        BackfillWindow(oldest, latest),
+                        partial(fetch_window, window_context),
+                    )
+                window, records = prefetcher.pop_ready(block=True)
+                yield from records
+                yield window
+        finally:
+            # A window left partway may have its worker blocked on a full buffer.
+            if records is not None:
+                records.cancel()
+            prefetcher.close()
+
+    def _request_chain(self, context: dict) -> Iterator[dict]:
+        """Request a chain of pages, labelling its page markers with its range."""
+        try:
+            for row in super().request_records(context):
+                if isinstance(row, PageMarker):
+                    row = row._replace(
+                        oldest=context["oldest"], latest=context["latest"]
+                    )
+                yield row
+        except SlackInvalidCursorError:
+            if "cursor" not in context:
+                raise
+            # The saved cursor expired, so walk the chain from its start again.
+            self.logger.warning(
+                "Cursor checkpoint of %s expired, restarting", context["channel_id"]
+            )
+            context = {key: value for key, value in context.items() if key != "cursor"}
+            yield from self._request_chain(context)
 
     def get_url_params(self, context, next_page_token):
         """Augment default to implement incremental syncing."""
         params = super().get_url_params(context, next_page_token)
-        start_timestamp = self.get_starting_replication_key_value(context)
+        if context and "latest" in context:
+            # A planned chain, inclusive so no message falls between chains.
+            params["oldest"] = context["oldest"]
+            params["latest"] = context["latest"]
+            params["inclusive"] = "true"
+            if not next_page_token and context.get("cursor"):
+                params["cursor"] = context["cursor"]
+            return params
+        start_timestamp = self._starting_timestamp(context)
         if start_timestamp:
             params["oldest"] = start_timestamp
         return params
 
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Follow the records of each page with a marker of the page's end."""
+        yield from super().parse_response(response)
+        yield PageMarker(next_cursor(response))
+
+    def _checkpoints(self, context: dict | None, rows: Iterable) -> Iterator[dict]:
+        """
+        Record sync progress in the partition's state from the markers between
+        records: drop each backfill window once its records are synced, and
+        save the cursor of the next page and the highest ts seen after every
+        page, writing a STATE message every `cursor_checkpoint_pages` pages.
+
+        With `batch_config`, the records of a page may not be written out when
+        the page ends, so windows are only dropped once their records are
+        batched, and cursors are not checkpointed.
+        """
+        state = self.get_context_state(context)
+        interval = 0 if self.batching else self.config["cursor_checkpoint_pages"]
+        max_ts = (state.get("cursor_checkpoint") or {}).get("max_ts")
+        pages = 0
+        for row in rows:
+            if isinstance(row, BackfillWindow):
+                if self.batching:
+                    self._unbatched_windows.append(row)
+                else:
+                    self._checkpoint_backfill(state, row)
+            elif isinstance(row, PageMarker):
+                if not interval or "backfill_windows" in state:
+                    continue
+                state["cursor_checkpoint"] = {
+                    "oldest": row.oldest,
+                    "latest": row.latest,
+                    "cursor": row.next_cursor,
+                    "max_ts": max_ts,
+                }
+                pages += 1
+                if pages % interval == 0:
+                    self.state_manager.is_flushed = False
+                    self._write_state_message(force=True)
+            else:
+                if max_ts is None or float(row["ts"]) > float(max_ts):
+                    max_ts = row["ts"]
+                yield row
+        if state.pop("cursor_checkpoint", None) and max_ts:
+            # Messages synced before an interruption count toward the bookmark.
+            self.state_manager.increment_state(
+                {self.replication_key: max_ts},
+                context=context,
+                replication_key=self.replication_key,
+            )
+
+    def _checkpoint_backfill(self, state: dict, window: BackfillWindow) -> None:
+        """Drop a backfill window from state once its records are synced."""
+        state["backfill_windows"].remove(list(window))
+        if not state["backfill_windows"]:
+            del state["backfill_windows"]
+            # Without any record to promote to a bookmark, start the next run
+            # where the backfill ended.
+            state.setdefault("replication_key", self.replication_key)
+            state.setdefault(
+                "replication_key_value", f"{state.pop('backfill_until'):.6f}"
+            )
+
+    def get_records(self, context: dict | None) -> Iterable[dict]:
+        """
+        Fetch the replies of threaded messages on a pool of worker threads,
+        and sync the threads stream from them as the fetches complete.
+
+        Threads are skipped when the parent message has no replies, or shows
+        the same latest reply and reply count as when the thread was last
+        synced, as recorded in the "thread_replies" index of the channel's
+        state. Otherwise only the replies after the latest reply synced are
+        fetched.
+        """
+        if context_key(context) not in self._prefetched_records:
+            self._plan_requests(context)
+        self._emitted_messages = self._get_emitted_index(context)
+        self._emitted_until = float(
+            self.get_context_state(context).get("replication_key_value") or 0
+        )
+        self._unbatched_messages = {}
+        self._unbatched_windows = []
+        rows = self._checkpoints(context, super().get_records(context))
+        threads_stream = self._tap.streams.get("threads")
+        if threads_stream is None or not threads_stream.selected:
+            yield from rows
+            return
+
+        thread_index = self._get_thread_index(context)
+        fingerprints: dict[str, list] = {}
+        prefetcher = Prefetcher(self.config["thread_workers"])
+        max_pending = prefetcher.max_workers * 4
+
+        # Threads synced, but whose records may still be buffered for a batch.
+        unflushed: dict[str, list] = {}
+
+        def sync_thread(threads_context: dict, records: Iterable[dict]) -> None:
+            threads_stream.sync_prefetched(threads_context, records)
+            thread_ts = threads_context["thread_ts"]
+            fingerprint = fingerprints.pop(thread_ts)
+            if float(thread_ts) >= self.threads_stream_start:
+                unflushed[thread_ts] = fingerprint
+            # Only index threads once their records are written out.
+            if not threads_stream.buffered_records:
+                thread_index.update(unflushed)
+                unflushed.clear()
+
+        try:
+            for row in rows:
+                if row.get("thread_ts") and row.get("reply_count"):
+                    fingerprint = [row.get("latest_reply"), row.get("reply_count")]
+                    synced = thread_index.get(row["ts"])
+                    if synced != fingerprint:
+                        fingerprints[row["ts"]] = fingerprint
+                        threads_context = {**context, "thread_ts": row["ts"]}
+                        prefetcher.submit(
+                            threads_context,
+                            threads_stream.prefetch(
+                                threads_context, oldest=synced and synced[0]
+                            ),
+                        )
+                yield row
+                while ready := prefetcher.pop_ready(
+                    block=len(prefetcher) >= max_pending
+                ):
+                    sync_thread(*ready)
+            while ready := prefetcher.pop_ready(block=True):
+                sync_thread(*ready)
+            threads_stream.flush_batches()
+            thread_index.update(unflushed)
+        finally:
+            prefetcher.close()
+
+    def _get_thread_index(self, context: dict | None) -> dict[str, list]:
+        """
+        Return the channel's index of thread_ts to [latest_reply, reply_count],
+        dropping threads started before the lookback window as they are no
+        longer re-synced.
+        """
+        state = self.get_context_state(context)
+        cutoff = self.threads_stream_start
+        state["thread_replies"] = {
+            thread_ts: fingerprint
+            for thread_ts, fingerprint in state.get("thread_replies", {}).items()
+            if float(thread_ts) >= cutoff
+        }
+        return state["thread_replies"]
+
+    def _get_emitted_index(self, context: dict | None) -> dict[str, str]:
+        """
+        Return the channel's index of ts to message fingerprint for the
+        messages emitted within the lookback window.
+
+        Messages at or below the partition's bookmark have all been emitted,
+        so the index only keeps those that were edited, replied to or reacted
+        to, whose fingerprint tells whether they changed since. Messages that
+        are still plain are only indexed until the bookmark passes them.
+        """
+        state = self.get_context_state(context)
+        self._prune_emitted_index(state)
+        return state["emitted_messages"]
+
+    def _prune_emitted_index(self, state: dict) -> None:
+        """
+        Drop the messages that are older than the lookback window, as they
+        are no longer fetched again, and the plain messages at or below the
+        bookmark from the emitted message index.
+        """
+        index = state.setdefault("emitted_messages", {})
+        cutoff = self.threads_stream_start
+        emitted_until = float(state.get("replication_key_value") or 0)
+        for ts in [
+            ts
+            for ts, fingerprint in index.items()
+            if float(ts) < cutoff
+            or (fingerprint == PLAIN_FINGERPRINT and float(ts) <= emitted_until)
+        ]:
+            del index[ts]
+
+    def _finalize_state(self, state: dict | None = None) -> None:
+        """Prune the emitted message index once a partition's bookmark moves."""
+        super()._finalize_state(state)
+        if state and "emitted_messages" in state:
+            self._prune_emitted_index(state)
+
+    def _emitted_fingerprint(self, ts: str) -> str | None:
+        """Return the fingerprint of a message as it was last emitted, if it was."""
+        fingerprint = self._unbatched_messages.get(ts, self._emitted_messages.get(ts))
+        if fingerprint is None and float(ts) <= self._emitted_until:
+            return PLAIN_FINGERPRINT
+        return fingerprint
+
     def post_process(self, row: dict, context: dict | None) -> dict | None:
         """
-        Directly invoke the threads stream sync on relevant messages,
-        and filter out messages that have already been synced before.
+        Filter out messages that have already been synced before, including
+        messages fetched again for the thread lookback that did not change
+        since they were emitted, and the message at the bookmark, which the
+        inclusive `oldest` bound of a request chain returns again.
         """
-        threads_stream = self._tap.streams["threads"]
-        replication_key_ts = self.get_starting_replication_key_value(context)
-        if row.get("thread_ts") and threads_stream.selected:
-            threads_context = {**context, **{"thread_ts": row["ts"]}}
-            threads_stream.sync(context=threads_context)
-            time.sleep(60.0 / threads_stream.max_requests_per_minute)
-        if row["ts"] and float(row["ts"]) < replication_key_ts:
+        replication_key_ts = self._starting_timestamp(context)
+        ts = row["ts"]
+        if ts and float(ts) < replication_key_ts:
+            return None
+        if ts and float(ts) >= self.threads_stream_start:
+            fingerprint = message_fingerprint(row)
+            if fingerprint == self._emitted_fingerprint(ts):
+                return None
+            if self.batching:
+                self._unbatched_messages[ts] = fingerprint
+            else:
+                self._emitted_messages[ts] = fingerprint
+        elif ts and float(ts) <= self._emitted_until:
             return None
         return row
 
+    def get_batches(self, batch_config, context=None):
+        """
+        Record the messages and backfill windows of each batch in the
+        partition's state as the batch is written out. Recording them as they
+        are synced would let a STATE message written before the batch, e.g.
+        after a batch of thread replies, skip them on the next run.
+        """
+        for batch in super().get_batches(batch_config, context):
+            state = self.get_context_state(context)
+            self._emitted_messages.update(self._unbatched_messages)
+            self._unbatched_messages.clear()
+            self._prune_emitted_index(state)
+            for window in self._unbatched_windows:
+                self._checkpoint_backfill(state, window)
+            self._unbatched_windows.clear()
+            yield batch
+
     def get_starting_replication_key_value(self, context: dict | None) -> int | None:
         """
         Threads can continue to have messages for weeks after the original message
@@ -141,13 +861,13 @@ class MessagesStream(SlackStream):
         """
         state = self.get_context_state(context)
         replication_key_value = state.get("replication_key_value")
+        start_timestamp = self._tap.sync_plan.start_timestamp
         if replication_key_value:
             if self.threads_stream_start < float(replication_key_value):
                 return self.threads_stream_start
             return float(replication_key_value)
-        elif "start_date" in self.config:
-            start_date = datetime.fromisoformat(self.config["start_date"])
-            return start_date.replace(tzinfo=timezone.utc).timestamp()
+        elif start_timestamp is not None:
+            return start_timestamp
         else:
             self.logger.info(
                 "Setting replication value to 0 to perform full historical sync."
@@ -159,19 +879,80 @@ class ThreadsStream(SlackStream):
     """
     The threads stream is directly invoked by the Messages stream, but not via
     standard parent-child relationship. Instead, parsed messages that have a
-    more recent "last_reply_at" timestamp will have a FULL_TABLE sync performed.
+    more recent "latest_reply" timestamp (or a different reply count) than at
+    their last sync will have their new replies synced, from replies fetched
+    concurrently while the messages are paginated. The parent message, which
+    Slack returns along with the replies, is left to the messages stream.
     """
 
     name = "threads"
     path = "/conversations.replies"
     primary_keys = ["channel_id", "thread_ts", "ts"]
-    records_jsonpath = "messages.[*]"
-    max_requests_per_minute = 50
-    schema = schemas.threads
+    records_key = "messages"
+    schema = schemas.stream_schema
+    supports_batches = True
 
     state_partitioning_keys = []
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._batch_config: BatchConfig | None = None
+        self._batch_records: list[dict] = []
+
+    @property
+    def buffered_records(self) -> int:
+        """Return the number of records buffered for the next batch."""
+        return len(self._batch_records)
+
+    def get_records(self, context: dict | None) -> Iterable[dict]:
+        """Only sync threads for the message contexts given by the messages stream."""
+        if context:
+            yield from super().get_records(context)
+
+    def prefetch(
+        self, context: dict, oldest: str | None = None
+    ) -> Callable[[], Iterable[dict]]:
+        """Return a function requesting the replies of a thread posted after
+        `oldest`, the latest reply synced before, or else all its replies."""
+        if oldest:
+            return partial(self.request_records, {**context, "oldest": oldest})
+        return super().prefetch(context)
+
+    def get_url_params(self, context, next_page_token):
+        """Only ask for the replies after the `oldest` given to `prefetch`."""
+        params = super().get_url_params(context, next_page_token)
+        if context and context.get("oldest"):
+            params["oldest"] = context["oldest"]
+        return params
+
+    def get_batches(self, batch_config, context=None):
+        """
+        Buffer the records of each thread, as threads are synced one at a
+        time, and write them out in batches of the configured size. The
+        messages stream flushes the rest at the end of each channel.
+        """
+        self._batch_config = batch_config
+        self._batch_records.extend(self._sync_records(context, write_messages=False))
+        if len(self._batch_records) >= batch_config.batch_size:
+            yield from self._flush_batches()
+
+    def flush_batches(self) -> None:
+        """Write a BATCH message for the records buffered so far."""
+        for encoding, manifest in self._flush_batches():
+            self._write_batch_message(encoding=encoding, manifest=manifest)
+
+    def _flush_batches(self) -> Iterator[tuple]:
+        if not self._batch_records:
+            return
+        records, self._batch_records = self._batch_records, []
+        batcher = Batcher(self.tap_name, self.name, self._batch_config)
+        for manifest in batcher.get_batches(records=iter(records)):
+            yield self._batch_config.encoding, manifest
+
     def post_process(self, row, context=None):
+        if row["ts"] == context.get("thread_ts"):
+            # The parent message is synced by the messages stream.
+            return None
         row = super().post_process(row, context=context)
         row["channel_id"] = context.get("channel_id")
         return row
@@ -182,5 +963,39 @@ class UsersStream(SlackStream):
     path = "/users.list"
     primary_keys = ["id"]
     replication_key = None
-    records_jsonpath = "members.[*]"
-    schema = schemas.users
+    records_key = "members"
+    schema = schemas.stream_schema
+    supports_batches = True
+
+    @property
+    def partitions(self) -> list[dict] | None:
+        """List the users of each workspace when syncing several."""
+        return self._tap.workspace_partitions
+
+    def get_records(self, context: dict | None) -> Iterable[dict]:
+        """Emit only new and updated users, unless the user directory is stale.
+
+        Every user is still listed, as `users.list` has no filter for recent
+        changes, but unchanged users are only emitted by a full refresh once
+        the users cache is older than `users_cache_ttl_hours`.
+        """
+        directory = self._tap.user_directories[(context or {}).get("team_id")]
+        ttl_seconds = self.config["users_cache_ttl_hours"] * 3600
+        full_refresh = not directory.path or directory.is_stale(ttl_seconds)
+        user_ids = set()
+        for user in super().get_records(context):
+            user_ids.add(user["id"])
+            if directory.update(user) or full_refresh:
+                yield user
+        if full_refresh:
+            directory.refreshed(user_ids)
+        # Each record is written before the next one is requested, so every
+        # user is written out by now, unless they are batched.
+        if not self.batching:
+            directory.save()
+
+    def get_batches(self, batch_config, context=None):
+        """Save the user directory once the last batch of users is written, so
+        that users are not cached as synced before they were emitted."""
+        yield from super().get_batches(batch_config, context)
+        self._tap.user_directories[(context or {}).get("team_id")].save()
@@ -1,8 +1,21 @@
 """Slack tap class."""
 
+import time
+from functools import cached_property
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
 from singer_sdk import Stream, Tap
 from singer_sdk import typing as th
+from singer_sdk.exceptions import ConfigValidationError
 
+from tap_slack.metrics import SyncMetrics
+from tap_slack.paging import PageSizer
+from tap_slack.plan import SyncPlan
+from tap_slack.rate_limit import RateLimiter
+from tap_slack.response_cache import CACHE_MODES, ResponseCache
+from tap_slack.state import StateMessageThrottle
 from tap_slack.streams import (
     ChannelsStream,
     ChannelMembersStream,
@@ -10,6 +23,7 @@ from tap_slack.streams import (
     ThreadsStream,
     UsersStream,
 )
+from tap_slack.users import UserDirectory
 
 STREAM_TYPES = [
     ChannelsStream,
@@ -19,6 +33,8 @@ STREAM_TYPES = [
     UsersStream,
 ]
 ADMIN_STREAM_TYPES = []
+# Streams synced by another stream that is not their SDK parent stream.
+SYNCED_BY = {ThreadsStream: MessagesStream}
 
 
 class TapSlack(Tap):
@@ -30,8 +46,17 @@ class TapSlack(Tap):
         th.Property(
             "api_key",
             th.StringType,
-            required=True,
-            description="The token to authenticate against the Slack API service",
+            description="The token to authenticate against the Slack API service. Required unless `workspaces` is set.",
+        ),
+        th.Property(
+            "workspaces",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property("team_id", th.StringType, required=True),
+                    th.Property("api_key", th.StringType, required=True),
+                )
+            ),
+            description="The workspaces to sync in place of the `api_key` one, each with its team id and token. Records are then keyed by `team_id`, and the workspaces are synced concurrently, each within its own rate limits.",
         ),
         th.Property(
             "start_date",
@@ -44,6 +69,53 @@ class TapSlack(Tap):
             default=1,
             description="The number of days to look in the past for new thread replies to existing messages",
         ),
+        th.Property(
+            "thread_workers",
+            th.IntegerType,
+            default=4,
+            description="The number of worker threads fetching thread replies while messages are paginated",
+        ),
+        th.Property(
+            "channel_workers",
+            th.IntegerType,
+            default=1,
+            description="The number of channels whose messages and members are fetched at the same time. All workers share the per-method rate limits.",
+        ),
+        th.Property(
+            "cursor_checkpoint_pages",
+            th.IntegerType,
+            default=10,
+            description="The number of message pages of a channel after which its pagination cursor is saved in a STATE message, so that an interrupted sync resumes from that page. Set to 0 to disable. Cursors are not saved with `batch_config`, as the state only records messages once they are batched.",
+        ),
+        th.Property(
+            "adaptive_page_size",
+            th.BooleanType,
+            default=True,
+            description="Whether to adapt the number of records requested per page to the size and latency of the pages of each channel fetched so far, requesting as many records per call as `max_page_megabytes` and `max_page_seconds` allow. Otherwise, pages of 500 records are requested.",
+        ),
+        th.Property(
+            "max_page_megabytes",
+            th.NumberType,
+            default=8,
+            description="The size that adaptive page sizes keep API responses under.",
+        ),
+        th.Property(
+            "max_page_seconds",
+            th.NumberType,
+            default=10,
+            description="The latency that adaptive page sizes keep API responses under.",
+        ),
+        th.Property(
+            "backfill_window_days",
+            th.NumberType,
+            description="When set, the message history of a channel spanning more than this many days, as in a first sync, is split into windows of this many days that are fetched concurrently. Each window is checkpointed in the state, so an interrupted backfill resumes with the windows left.",
+        ),
+        th.Property(
+            "backfill_workers",
+            th.IntegerType,
+            default=4,
+            description="The number of backfill windows of a channel fetched at the same time",
+        ),
         th.Property(
             "channel_types",
             th.ArrayType(th.StringType),
@@ -56,6 +128,18 @@ class TapSlack(Tap):
             default=False,
             description="Whether the bot user should attempt to join channels that it has not yet joined. The bot user must be a member of the channel to retrieve messages.",
         ),
+        th.Property(
+            "auto_join_workers",
+            th.IntegerType,
+            default=4,
+            description="The maximum number of channels joined at once when `auto_join_channels` is enabled.",
+        ),
+        th.Property(
+            "auto_join_retry_hours",
+            th.NumberType,
+            default=24,
+            description="The number of hours to wait before trying again to join a channel that could not be joined. The messages of such channels are not synced meanwhile.",
+        ),
         th.Property(
             "selected_channels",
             th.ArrayType(th.StringType),
@@ -66,6 +150,88 @@ class TapSlack(Tap):
             th.ArrayType(th.StringType),
             description="A list of channel IDs that should not be retrieved. Excluding overrides a selected setting, so if a channel is included in both selected and excluded, it will be excluded.",
         ),
+        th.Property(
+            "emit_unchanged_channels",
+            th.BooleanType,
+            default=True,
+            description="Whether to emit channels whose updated timestamp, member count, and archived status did not change since the previous run. The members of unchanged channels, and the messages of channels that were already archived, are not synced again either way.",
+        ),
+        th.Property(
+            "selected_channel_patterns",
+            th.ArrayType(th.StringType),
+            description="A list of glob patterns, such as 'eng-*', selecting channels by name in addition to selected_channels",
+        ),
+        th.Property(
+            "excluded_channel_patterns",
+            th.ArrayType(th.StringType),
+            description="A list of glob patterns, such as 'archive-*', excluding channels by name in addition to excluded_channels",
+        ),
+        th.Property(
+            "rate_limits",
+            th.ObjectType(additional_properties=th.NumberType),
+            description="Requests per minute to allow for individual Slack API methods, keyed by method name (e.g. conversations.history). Overrides the default for the method's rate limit tier.",
+        ),
+        th.Property(
+            "record_conformance",
+            th.ObjectType(
+                additional_properties=th.StringType(
+                    allowed_values=["full", "sample", "none"]
+                )
+            ),
+            default={},
+            description="How many records of each stream, keyed by stream name, to conform to the stream's schema before emitting them: `full` (the default) for every record, `sample` for one in `record_conformance_sample_rate` records, or `none`. Skipped records are emitted as fetched, with any properties missing from the schema. Streams with deselected properties conform every record.",
+        ),
+        th.Property(
+            "record_conformance_sample_rate",
+            th.IntegerType,
+            default=100,
+            description="Conform one in this many records of the streams whose `record_conformance` is `sample`.",
+        ),
+        th.Property(
+            "users_cache_path",
+            th.StringType,
+            description="A file to keep the user directory in between runs. When set, the users stream only emits users whose profile was updated since the previous run, apart from a periodic full refresh.",
+        ),
+        th.Property(
+            "users_cache_ttl_hours",
+            th.NumberType,
+            default=24,
+            description="The number of hours after which the users stream emits every user again, refreshing the user directory cache",
+        ),
+        th.Property(
+            "state_message_interval",
+            th.NumberType,
+            default=30,
+            description="The minimum number of seconds between STATE messages. Each message holds the state of every channel, so with many channels, a message after each channel would dominate the output. Cursor checkpoints and the state at the end of the sync are always written. Set to 0 to write every STATE message.",
+        ),
+        th.Property(
+            "response_cache_mode",
+            th.StringType(allowed_values=list(CACHE_MODES)),
+            default="off",
+            description="Whether to keep Slack API responses in the `response_cache_path` database, to repeat syncs without calling Slack: `record` stores every response, `replay` serves every request from the cache and fails on requests missing from it, and `ttl` serves the responses stored less than `response_cache_ttl_hours` ago and stores the others. Replays make the same requests as the recorded run given the same config and state.",
+        ),
+        th.Property(
+            "response_cache_path",
+            th.StringType,
+            description="The SQLite database file of the response cache. Required unless `response_cache_mode` is `off`.",
+        ),
+        th.Property(
+            "response_cache_ttl_hours",
+            th.NumberType,
+            default=24,
+            description="The number of hours that responses are served from the cache in the `ttl` response cache mode",
+        ),
+        th.Property(
+            "metrics_log_interval",
+            th.NumberType,
+            default=60,
+            description="The number of seconds between log lines reporting requests, latency, bytes, rate limiter sleep time and records per Slack API method. Set to 0 to only log them at the end of the sync.",
+        ),
+        th.Property(
+            "metrics_summary_path",
+            th.StringType,
+            description="A file to write a JSON summary of the sync's metrics to, per Slack API method and per channel",
+        ),
         th.Property(
             "include_admin_streams",
             th.BooleanType,
@@ -74,17 +240,199 @@ class TapSlack(Tap):
         ),
     ).to_dict()
 
-    def discover_streams(self) -> list[Stream]:
-        """Return a list of discovered streams."""
+    def _validate_config(self, *, raise_errors: bool = True) -> list[str]:
+        """Also require either `api_key` or `workspaces`, which the config's
+        JSON schema leaves out as each is optional on its own."""
+        errors = super()._validate_config(raise_errors=raise_errors)
+        if not self.config.get("api_key") and not self.config.get("workspaces"):
+            errors.append("Either api_key or workspaces must be set")
+            if raise_errors:
+                raise ConfigValidationError(
+                    "Config validation failed",
+                    errors=errors,
+                    schema=self.config_jsonschema,
+                )
+            self.logger.warning("Config validation failed")
+        return errors
 
-        streams = [stream_class(tap=self) for stream_class in STREAM_TYPES]
+    @cached_property
+    def http_session(self) -> requests.Session:
+        """
+        Return the HTTP session shared by every stream, keeping a pooled
+        keep-alive connection to Slack for each worker thread that may be
+        making requests at once.
+        """
+        config = self.config
+        workers = (
+            len(self.workspaces)
+            * config["channel_workers"]
+            * (1 + config["thread_workers"] + config["backfill_workers"])
+        )
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+        return session
 
-        if self.config.get("include_admin_streams"):
-            streams.extend(
-                [stream_class(tap=self) for stream_class in ADMIN_STREAM_TYPES]
+    @cached_property
+    def page_sizer(self) -> PageSizer:
+        """Return the adaptive page sizes shared by every stream of this tap."""
+        return PageSizer(
+            self.config["max_page_megabytes"] * 1024 * 1024,
+            self.config["max_page_seconds"],
+        )
+
+    @cached_property
+    def state_message_throttle(self) -> StateMessageThrottle:
+        """Return the pacing of the STATE messages of every stream."""
+        return StateMessageThrottle(self.config["state_message_interval"])
+
+    @cached_property
+    def metrics(self) -> SyncMetrics:
+        """Return the request and record metrics of this sync."""
+        return SyncMetrics(self.logger, self.config["metrics_log_interval"])
+
+    @cached_property
+    def response_cache(self) -> ResponseCache | None:
+        """Return the response cache set by `response_cache_mode`, if any."""
+        mode = self.config["response_cache_mode"]
+        if mode == "off":
+            return None
+        if not self.config.get("response_cache_path"):
+            raise ConfigValidationError(
+                "response_cache_path must be set with a response_cache_mode"
             )
+        return ResponseCache(
+            self.config["response_cache_path"],
+            mode,
+            self.config["response_cache_ttl_hours"] * 3600,
+        )
+
+    @cached_property
+    def sync_plan(self) -> SyncPlan:
+        """Return the channel filters and cutoffs of this run, which starts
+        when the recorded run did when replaying cached responses."""
+        now = time.time()
+        if self.response_cache is not None:
+            now = self.response_cache.start_run(now)
+        return SyncPlan.from_config(self.config, now)
+
+    @cached_property
+    def workspaces(self) -> dict[str | None, str]:
+        """Return the token of each workspace by team id, or of the `api_key`
+        workspace under None."""
+        if self.config.get("workspaces"):
+            return {
+                workspace["team_id"]: workspace["api_key"]
+                for workspace in self.config["workspaces"]
+            }
+        if not self.config.get("api_key"):
+            raise ConfigValidationError("Either api_key or workspaces must be set")
+        return {None: self.config["api_key"]}
+
+    @property
+    def workspace_partitions(self) -> list[dict] | None:
+        """Return a partition per workspace when syncing several, else None."""
+        if None in self.workspaces:
+            return None
+        return [{"team_id": team_id} for team_id in self.workspaces]
+
+    @cached_property
+    def rate_limiters(self) -> dict[str | None, RateLimiter]:
+        """Return the rate limiter of each workspace, shared by every stream,
+        as Slack's rate limits apply per workspace."""
+        return {
+            team_id: RateLimiter(self.config.get("rate_limits"))
+            for team_id in self.workspaces
+        }
+
+    @cached_property
+    def user_directories(self) -> dict[str | None, UserDirectory]:
+        """Return the user directory of each workspace, loaded from the users
+        cache file if set. With several workspaces, each has its own file,
+        named after `users_cache_path` and the team id."""
+        directories = {}
+        for team_id in self.workspaces:
+            path = self.config.get("users_cache_path")
+            if path and team_id:
+                path = Path(path)
+                path = path.with_name(f"{path.stem}.{team_id}{path.suffix}")
+            directories[team_id] = UserDirectory(path)
+        return directories
+
+    def sync_all(self) -> None:
+        """Sync all streams and write the state left unwritten, then report the
+        metrics of each Slack API method and the use of the response cache.
 
-        return streams
+        As in the SDK, no state is written after a failed sync, as it may hold
+        the bookmarks of records that were never written out, such as records
+        still waiting for a batch.
+        """
+        try:
+            super().sync_all()
+            self._write_unflushed_state()
+        finally:
+            for team_id, rate_limiter in self.rate_limiters.items():
+                for method, count in sorted(rate_limiter.throttle_counts.items()):
+                    self.logger.info(
+                        "Slack rate limited %s %d times%s",
+                        method,
+                        count,
+                        f" in {team_id}" if team_id else "",
+                    )
+            if self.response_cache is not None:
+                self.logger.info(
+                    "Served %d responses from the response cache, stored %d",
+                    self.response_cache.hits,
+                    self.response_cache.stored,
+                )
+            self.metrics.log()
+            if self.config.get("metrics_summary_path"):
+                self.metrics.write_summary(self.config["metrics_summary_path"])
+
+    def _write_unflushed_state(self) -> None:
+        """Write the state left unwritten by throttled STATE messages."""
+        unflushed = [
+            stream
+            for stream in self.streams.values()
+            if not stream.state_manager.is_flushed
+        ]
+        if unflushed:
+            self.state_writer.write_state(self.state)
+        for stream in unflushed:
+            stream.state_manager.is_flushed = True
+
+    def discover_streams(self) -> list[Stream]:
+        """Return a list of discovered streams.
+
+        When syncing with a catalog, only the selected streams and their
+        parents are created.
+        """
+        stream_types = list(STREAM_TYPES)
+        if self.config.get("include_admin_streams"):
+            stream_types.extend(ADMIN_STREAM_TYPES)
+        if self.input_catalog is not None:
+            stream_types = self._catalogued_stream_types(stream_types)
+        return [stream_class(tap=self) for stream_class in stream_types]
+
+    def _catalogued_stream_types(
+        self, stream_types: list[type[Stream]]
+    ) -> list[type[Stream]]:
+        """Return the stream types that syncing the input catalog requires.
+
+        Streams missing from the catalog are kept, as they sync by default.
+        """
+        required = set()
+        for stream_class in stream_types:
+            entry = self.input_catalog.get_stream(stream_class.name)
+            if entry is not None and not entry.metadata.resolve_selection()[()]:
+                continue
+            while stream_class is not None:
+                required.add(stream_class)
+                stream_class = SYNCED_BY.get(
+                    stream_class, stream_class.parent_stream_type
+                )
+        return [
+            stream_class for stream_class in stream_types if stream_class in required
+        ]
 
     @property
     def expectations(self):
@@ -0,0 +1,62 @@
+"""A cache of the workspace's user directory, persisted between runs."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+# User fields kept in the cache, besides the `updated` timestamp.
+CACHED_FIELDS = ("name", "real_name", "deleted", "is_bot")
+
+
+class UserDirectory:
+    """User ids mapped to their last seen `updated` timestamp and name fields.
+
+    The directory tells which users changed since it was last refreshed. With
+    a ``path``, it is loaded from and saved to a JSON file, so it carries over
+    to the next run.
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None) -> None:
+        self.path = Path(path) if path else None
+        self.users: dict[str, dict] = {}
+        # Unix time of the last full refresh, 0 when never refreshed.
+        self.refreshed_at = 0.0
+        if self.path and self.path.exists():
+            cache = json.loads(self.path.read_text())
+            self.users = cache.get("users", {})
+            self.refreshed_at = cache.get("refreshed_at", 0.0)
+
+    def is_stale(self, ttl_seconds: float) -> bool:
+        """Whether the directory is due for a full refresh."""
+        return time.time() - self.refreshed_at >= ttl_seconds
+
+    def update(self, user: dict) -> bool:
+        """Record a user, returning whether it is new or changed."""
+        cached = self.users.get(user["id"])
+        if cached is not None and cached["updated"] == user.get("updated"):
+            return False
+        entry = {field: user.get(field) for field in CACHED_FIELDS}
+        entry["updated"] = user.get("updated")
+        self.users[user["id"]] = entry
+        return True
+
+    def refreshed(self, user_ids: set[str]) -> None:
+        """Mark a full refresh as done, forgetting users no longer listed."""
+        self.users = {
+            user_id: user for user_id, user in self.users.items() if user_id in user_ids
+        }
+        self.refreshed_at = time.time()
+
+    def save(self) -> None:
+        """Write the directory to its file, replacing the previous version."""
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        temp_path.write_text(
+            json.dumps({"refreshed_at": self.refreshed_at, "users": self.users})
+        )
+        os.replace(temp_path, self.path)
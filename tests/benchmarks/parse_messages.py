@@ -0,0 +1,138 @@
+"""Compare CPU time and peak memory of parsing conversations.history pages.
+
+Each parser runs in a fresh process. Peak memory is the high-water mark of
+memory allocated while parsing, on top of the encoded pages themselves. As
+pages are parsed one at a time it should not grow with the message count:
+
+    python -m tests.benchmarks.parse_messages --messages 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import time
+import tracemalloc
+
+import requests
+from singer_sdk.helpers.jsonpath import extract_jsonpath
+
+from tap_slack.client import SlackCursorPaginator, json_loads, response_json
+
+PAGE_SIZE = 500
+
+
+def make_message(index: int) -> dict:
+    """Return a message with the blocks and attachments of a busy channel."""
+    ts = f"{1700000000 + index}.000100"
+    return {
+        "type": "message",
+        "ts": ts,
+        "user": f"U{index % 50:04d}",
+        "text": "Deploy finished " * 10,
+        "blocks": [
+            {
+                "type": "rich_text",
+                "block_id": f"b{index}-{block}",
+                "elements": [
+                    {
+                        "type": "rich_text_section",
+                        "elements": [{"type": "text", "text": "status " * 20}],
+                    }
+                ],
+            }
+            for block in range(4)
+        ],
+        "attachments": [
+            {"id": 1, "fallback": "build log " * 30, "color": "36a64f"},
+        ],
+        "reactions": [{"name": "tada", "users": ["U0001", "U0002"], "count": 2}],
+    }
+
+
+def make_pages(messages: int) -> list[bytes]:
+    """Return encoded conversations.history pages holding the messages."""
+    pages = []
+    for start in range(0, messages, PAGE_SIZE):
+        batch = [
+            make_message(i) for i in range(start, min(start + PAGE_SIZE, messages))
+        ]
+        cursor = f"cursor-{start + PAGE_SIZE}" if start + PAGE_SIZE < messages else ""
+        payload = {
+            "ok": True,
+            "messages": batch,
+            "response_metadata": {"next_cursor": cursor},
+        }
+        pages.append(json.dumps(payload).encode())
+    return pages
+
+
+def make_response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    return response
+
+
+def parse_jsonpath(pages: list[bytes]) -> int:
+    """Parse pages the way the tap did before: jsonpath over `response.json()`."""
+    count = 0
+    for content in pages:
+        response = make_response(content)
+        count += sum(1 for _ in extract_jsonpath("messages.[*]", response.json()))
+        list(extract_jsonpath("$.response_metadata.next_cursor", response.json()))
+    return count
+
+
+def parse_records_key(pages: list[bytes]) -> int:
+    """Parse pages the way the tap does now: one decode and a key lookup."""
+    count = 0
+    paginator = SlackCursorPaginator()
+    for content in pages:
+        response = make_response(content)
+        count += sum(1 for _ in response_json(response).get("messages", ()))
+        paginator.get_next(response)
+    return count
+
+
+PARSERS = {"jsonpath": parse_jsonpath, "records_key": parse_records_key}
+
+
+def measure(name: str, messages: int, results: multiprocessing.Queue) -> None:
+    pages = make_pages(messages)
+    started = time.process_time()
+    count = PARSERS[name](pages)
+    cpu_seconds = time.process_time() - started
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    PARSERS[name](pages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results.put((name, count, cpu_seconds, (peak - baseline) / 1024))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20_000)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"JSON backend: {json_loads.__module__}")
+    print(f"{'parser':<12} {'CPU ms / 1k msgs':>18} {'peak KiB':>10}")
+    for name in PARSERS:
+        results = context.Queue()
+        process = context.Process(target=measure, args=(name, args.messages, results))
+        process.start()
+        _, count, cpu_seconds, peak_kib = results.get()
+        process.join()
+        per_thousand = 1000 / count
+        print(
+            f"{name:<12} {cpu_seconds * 1000 * per_thousand:>18.1f} "
+            f"{peak_kib:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Benchmark conforming message records, with the SDK and a compiled conformer.
+
+Run with ``pytest tests/benchmarks --benchmark-only``.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import pytest
+from singer_sdk.helpers._catalog import pop_deselected_record_properties
+from singer_sdk.helpers._typing import conform_record_data_types
+from singer_sdk.helpers.conform import TypeConformanceLevel
+from singer_sdk.singerlib.catalog import SelectionMask
+
+from tap_slack.conform import compile_conformer
+from tap_slack.schemas.messages import schema
+from tests.benchmarks.parse_messages import make_message
+
+pytest.importorskip("pytest_benchmark")
+
+MESSAGES = [make_message(index) for index in range(1000)]
+MASK = SelectionMask({(): True})
+LOGGER = logging.getLogger(__name__)
+
+
+def conform_sdk(messages: list[dict]) -> None:
+    for message in messages:
+        pop_deselected_record_properties(message, schema, MASK)
+        conform_record_data_types(
+            "messages", message, schema, TypeConformanceLevel.RECURSIVE, LOGGER
+        )
+
+
+def conform_compiled(messages: list[dict]) -> None:
+    conform = compile_conformer(schema, MASK)
+    unmapped: set[str] = set()
+    for message in messages:
+        conform(message, unmapped)
+
+
+@pytest.mark.parametrize("conformer", [conform_sdk, conform_compiled])
+def test_conform_messages(benchmark, conformer):
+    benchmark(conformer, MESSAGES)
@@ -0,0 +1,31 @@
+"""Benchmark the tap's startup, which short scheduled runs pay every time.
+
+Run with ``pytest tests/benchmarks --benchmark-only``.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+from tap_slack.tap import TapSlack
+from tests.test_startup import CONFIG, select_streams
+
+pytest.importorskip("pytest_benchmark")
+
+
+def test_import(benchmark):
+    benchmark(
+        subprocess.run, [sys.executable, "-c", "import tap_slack.tap"], check=True
+    )
+
+
+def test_discovery(benchmark):
+    benchmark(lambda: TapSlack(config=CONFIG).catalog.to_dict())
+
+
+def test_single_stream_catalog(benchmark):
+    catalog = select_streams(TapSlack(config=CONFIG).catalog.to_dict(), {"users"})
+    benchmark(lambda: TapSlack(config=CONFIG, catalog=catalog).streams)
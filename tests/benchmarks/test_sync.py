@@ -0,0 +1,95 @@
+"""Benchmark full syncs against a synthetic workspace, without network access.
+
+Run with ``pytest tests/benchmarks --benchmark-only``. Besides timings, each
+benchmark records records per second, the requests made per API method and
+the seconds spent waiting on the rate limiter in its ``extra_info``.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from tests.fake_slack import FakeSlackAdapter, Workspace, run_sync
+
+pytest.importorskip("pytest_benchmark")
+
+# Slack's rate limits scaled up so that a benchmark round takes seconds rather
+# than minutes, while keeping the ratios between method tiers.
+RATE_LIMITS = {
+    "conversations.history": 3000,
+    "conversations.list": 1200,
+    "conversations.members": 6000,
+    "conversations.replies": 3000,
+    "users.list": 1200,
+}
+
+SCENARIOS = {
+    "small": Workspace(channels=3, messages_per_channel=200),
+    "busy_threads": Workspace(channels=2, messages_per_channel=300, thread_density=0.5),
+    "many_channels": Workspace(channels=40, messages_per_channel=20),
+}
+
+
+def records_per_second(benchmark, result) -> float | None:
+    """Return the throughput of a benchmark, unless run without timings, as
+    with ``--benchmark-disable``."""
+    if benchmark.stats is None:
+        return None
+    return result.record_count / benchmark.stats.stats.mean
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_full_sync(benchmark, scenario, workers):
+    config = {
+        "rate_limits": RATE_LIMITS,
+        "thread_workers": workers,
+        "channel_workers": workers,
+    }
+    adapters = []
+
+    def setup():
+        # A fresh adapter per round, so request counts and rate limit windows
+        # don't carry over between rounds.
+        adapters.append(
+            FakeSlackAdapter(
+                SCENARIOS[scenario], latency=0.005, rate_limits=RATE_LIMITS
+            )
+        )
+        return (adapters[-1], config), {}
+
+    result = benchmark.pedantic(run_sync, setup=setup, rounds=3)
+
+    adapter = adapters[-1]
+    limiter = result.tap.rate_limiters[None]
+    benchmark.extra_info.update(
+        records_per_second=records_per_second(benchmark, result),
+        records={name: len(records) for name, records in result.records.items()},
+        requests=dict(adapter.requests),
+        throttled=dict(adapter.throttled),
+        rate_limiter_sleep_seconds=round(sum(limiter.sleep_seconds.values()), 3),
+    )
+    assert result.records["messages"]
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_replayed_sync(benchmark, scenario, tmp_path):
+    """Replay a recorded sync from the response cache, measuring the tap's own
+    processing without latency or rate limits."""
+    workspace = SCENARIOS[scenario]
+    config = {
+        "rate_limits": RATE_LIMITS,
+        "response_cache_path": str(tmp_path / "responses.sqlite"),
+    }
+    run_sync(FakeSlackAdapter(workspace), {**config, "response_cache_mode": "record"})
+    config["response_cache_mode"] = "replay"
+
+    result = benchmark.pedantic(
+        run_sync, args=(FakeSlackAdapter(workspace), config), rounds=3
+    )
+
+    benchmark.extra_info.update(
+        records_per_second=records_per_second(benchmark, result),
+        records={name: len(records) for name, records in result.records.items()},
+    )
+    assert result.records["messages"]
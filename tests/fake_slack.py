@@ -0,0 +1,344 @@
+"""A local stand-in for the Slack Web API, serving a synthetic workspace.
+
+``FakeSlackAdapter`` is a ``requests`` transport adapter: mounted on a session,
+it answers the API methods the tap calls without touching the network, and can
+simulate response latency and per-method rate limits.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from tap_slack.tap import TapSlack
+
+
+@dataclass
+class Workspace:
+    """A synthetic Slack workspace.
+
+    Messages are spread evenly over the ``history_days`` before ``now``, newest
+    last, and every ``1 / thread_density``-th message starts a thread.
+    """
+
+    channels: int = 5
+    messages_per_channel: int = 100
+    thread_density: float = 0.1
+    replies_per_thread: int = 3
+    users: int = 20
+    archived_channels: int = 0
+    # The last ``unjoined_channels`` channels do not have the bot as a member.
+    unjoined_channels: int = 0
+    # Slack errors returned when joining a channel, by channel id.
+    join_errors: dict[str, str] = field(default_factory=dict)
+    history_days: float = 3.0
+    now: float = field(default_factory=time.time)
+
+    def __post_init__(self) -> None:
+        self.channel_list = [self._channel(i) for i in range(self.channels)]
+        self.user_list = [
+            {
+                "id": f"U{i:05d}",
+                "team_id": "T00000",
+                "name": f"user{i}",
+                "updated": 1_700_000_000 + i,
+            }
+            for i in range(self.users)
+        ]
+        self.history: dict[str, list[dict]] = {}
+        self.replies: dict[tuple[str, str], list[dict]] = {}
+        for channel in self.channel_list:
+            self._build_history(channel["id"])
+
+    def _channel(self, index: int) -> dict:
+        return {
+            "id": f"C{index:05d}",
+            "name": f"channel-{index}",
+            "is_channel": True,
+            "is_member": index < self.channels - self.unjoined_channels,
+            "is_archived": index < self.archived_channels,
+            "created": 1_600_000_000,
+            "updated": 1_600_000_000_000,
+            "num_members": 2,
+        }
+
+    def _build_history(self, channel_id: str) -> None:
+        span = self.history_days * 86400
+        step = span / max(self.messages_per_channel, 1)
+        thread_every = round(1 / self.thread_density) if self.thread_density else 0
+        messages = []
+        for index in range(self.messages_per_channel):
+            ts = f"{self.now - span + index * step:.6f}"
+            message = {
+                "type": "message",
+                "ts": ts,
+                "user": self.user_list[index % self.users]["id"],
+                "text": f"message {index} in {channel_id}",
+            }
+            if thread_every and index % thread_every == 0:
+                replies = [
+                    {
+                        "type": "message",
+                        "ts": f"{float(ts) + reply + 1:.6f}",
+                        "thread_ts": ts,
+                        "parent_user_id": message["user"],
+                        "text": f"reply {reply}",
+                    }
+                    for reply in range(self.replies_per_thread)
+                ]
+                message.update(
+                    thread_ts=ts,
+                    reply_count=len(replies),
+                    latest_reply=replies[-1]["ts"] if replies else ts,
+                )
+                self.replies[channel_id, ts] = [dict(message), *replies]
+            messages.append(message)
+        self.history[channel_id] = messages
+
+    def add_reply(self, channel_id: str, thread_ts: str) -> None:
+        """Post a new reply to a thread, updating its parent message."""
+        thread = self.replies[channel_id, thread_ts]
+        reply_ts = f"{float(thread[-1]['ts']) + 1:.6f}"
+        thread.append({"type": "message", "ts": reply_ts, "thread_ts": thread_ts})
+        for message in (thread[0], *self.history[channel_id]):
+            if message["ts"] == thread_ts:
+                message.update(reply_count=len(thread) - 1, latest_reply=reply_ts)
+
+
+class FakeSlackAdapter(BaseAdapter):
+    """Serves a ``Workspace`` over the Slack Web API.
+
+    Args:
+        workspace: The workspace to serve.
+        latency: Seconds each response takes.
+        rate_limits: Requests per minute allowed for each API method. Calls over
+            the limit get an HTTP 429 response with a ``Retry-After`` header.
+        errors: HTTP error statuses by API method and call number, counting
+            from 1. These calls get an HTML error page, as from a proxy.
+    """
+
+    def __init__(
+        self,
+        workspace: Workspace,
+        latency: float = 0.0,
+        rate_limits: dict[str, float] | None = None,
+        errors: dict[str, dict[int, int]] | None = None,
+    ) -> None:
+        super().__init__()
+        self.workspace = workspace
+        self.latency = latency
+        self.rate_limits = rate_limits or {}
+        self.errors = errors or {}
+        self.requests: Counter[str] = Counter()
+        self.throttled: Counter[str] = Counter()
+        self.calls: list[tuple[str, dict]] = []
+        self._recent: dict[str, deque[float]] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs) -> requests.Response:
+        url = urlparse(request.url)
+        method = url.path.rsplit("/", 1)[-1]
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests[method] += 1
+            self.calls.append((method, params))
+            if self._over_limit(method):
+                self.throttled[method] += 1
+                return self._response(
+                    request,
+                    {"ok": False, "error": "ratelimited"},
+                    status=429,
+                    headers={"Retry-After": "1"},
+                )
+            status = self.errors.get(method, {}).get(self.requests[method])
+        if status:
+            response = self._response(request, {}, status=status)
+            response._content = b"<html><body>Service Unavailable</body></html>"
+            response.headers["Content-Type"] = "text/html"
+            return response
+        handler = getattr(self, "_" + method.replace(".", "_"), None)
+        body = handler(params) if handler else {"ok": False, "error": "unknown_method"}
+        return self._response(request, body)
+
+    def close(self) -> None:
+        pass
+
+    def _over_limit(self, method: str) -> bool:
+        """Check a one second sliding window against the method's rate limit."""
+        if method not in self.rate_limits:
+            return False
+        now = time.monotonic()
+        recent = self._recent[method]
+        while recent and recent[0] <= now - 1:
+            recent.popleft()
+        if len(recent) >= max(1, self.rate_limits[method] / 60):
+            return True
+        recent.append(now)
+        return False
+
+    @staticmethod
+    def _response(request, body: dict, status: int = 200, headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(body).encode()
+        response.headers["Content-Type"] = "application/json"
+        response.headers.update(headers or {})
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(0)
+        return response
+
+    @staticmethod
+    def _page(items: list, params: dict, key: str) -> dict:
+        limit = int(params.get("limit", 100))
+        start = int(params.get("cursor") or 0)
+        end = start + limit
+        cursor = str(end) if end < len(items) else ""
+        return {
+            "ok": True,
+            key: items[start:end],
+            "response_metadata": {"next_cursor": cursor},
+        }
+
+    @staticmethod
+    def _in_range(ts: str, params: dict) -> bool:
+        oldest = float(params.get("oldest", 0))
+        latest = float(params.get("latest", "inf"))
+        if params.get("inclusive") in ("true", "1"):
+            return oldest <= float(ts) <= latest
+        return oldest < float(ts) < latest
+
+    def _conversations_list(self, params: dict) -> dict:
+        channels = self.workspace.channel_list
+        if params.get("exclude_archived") in ("true", "1"):
+            channels = [c for c in channels if not c["is_archived"]]
+        return self._page(channels, params, "channels")
+
+    def _conversations_members(self, params: dict) -> dict:
+        members = [user["id"] for user in self.workspace.user_list[:2]]
+        return self._page(members, params, "members")
+
+    def _conversations_history(self, params: dict) -> dict:
+        history = self.workspace.history.get(params.get("channel"))
+        if history is None:
+            return {"ok": False, "error": "channel_not_found"}
+        if not self._channel(params["channel"])["is_member"]:
+            return {"ok": False, "error": "not_in_channel"}
+        messages = [m for m in reversed(history) if self._in_range(m["ts"], params)]
+        return self._page(messages, params, "messages")
+
+    def _conversations_replies(self, params: dict) -> dict:
+        thread = self.workspace.replies.get((params.get("channel"), params.get("ts")))
+        if thread is None:
+            return {"ok": False, "error": "thread_not_found"}
+        parent, *replies = thread
+        replies = [m for m in replies if self._in_range(m["ts"], params)]
+        return self._page([parent, *replies], params, "messages")
+
+    def _conversations_join(self, params: dict) -> dict:
+        channel_id = params.get("channel")
+        if channel_id in self.workspace.join_errors:
+            return {"ok": False, "error": self.workspace.join_errors[channel_id]}
+        self._channel(channel_id)["is_member"] = True
+        return {"ok": True, "channel": {"id": channel_id}}
+
+    def _channel(self, channel_id: str) -> dict:
+        return next(c for c in self.workspace.channel_list if c["id"] == channel_id)
+
+    def _users_list(self, params: dict) -> dict:
+        return self._page(self.workspace.user_list, params, "members")
+
+
+class FakeSlackWorkspaces(BaseAdapter):
+    """Serves several workspaces, routing each request by its token.
+
+    Args:
+        adapters: The adapter serving each workspace, keyed by token.
+    """
+
+    def __init__(self, adapters: dict[str, FakeSlackAdapter]) -> None:
+        super().__init__()
+        self.adapters = adapters
+        # The workspace whose clock and history set the sync's start date.
+        self.workspace = next(iter(adapters.values())).workspace
+
+    def send(self, request, **kwargs) -> requests.Response:
+        token = request.headers["Authorization"].removeprefix("Bearer ")
+        return self.adapters[token].send(request, **kwargs)
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class SyncResult:
+    """The Singer messages a sync wrote, sorted by type."""
+
+    records: dict[str, list[dict]]
+    states: list[dict]
+    tap: TapSlack
+    # The file URLs of each BATCH message, by stream.
+    batches: dict[str, list[list[str]]] = field(default_factory=dict)
+
+    @property
+    def record_count(self) -> int:
+        return sum(len(records) for records in self.records.values())
+
+    @property
+    def state(self) -> dict:
+        return self.states[-1] if self.states else {}
+
+
+def run_sync(
+    adapter: FakeSlackAdapter | FakeSlackWorkspaces,
+    config: dict | None = None,
+    state: dict | None = None,
+    expect_error: type[Exception] | None = None,
+) -> SyncResult:
+    """Sync every stream of the tap against the adapter's workspace.
+
+    With ``expect_error``, the sync must fail with that error, and the result
+    holds the messages written before it failed.
+    """
+    start = datetime.fromtimestamp(
+        adapter.workspace.now - adapter.workspace.history_days * 86400 - 60,
+        timezone.utc,
+    )
+    config = {"api_key": "xoxb-fake", "start_date": start.isoformat(), **(config or {})}
+    tap = TapSlack(config=config, state=state)
+    for stream in tap.streams.values():
+        stream.requests_session.mount("https://slack.com/", adapter)
+
+    output = io.StringIO()
+    with redirect_stdout(output):
+        if expect_error is None:
+            tap.sync_all()
+        else:
+            with pytest.raises(expect_error):
+                tap.sync_all()
+
+    records: dict[str, list[dict]] = defaultdict(list)
+    batches: dict[str, list[list[str]]] = defaultdict(list)
+    states = []
+    for line in output.getvalue().splitlines():
+        message = json.loads(line)
+        if message["type"] == "RECORD":
+            records[message["stream"]].append(message["record"])
+        elif message["type"] == "BATCH":
+            batches[message["stream"]].append(message["manifest"])
+        elif message["type"] == "STATE":
+            states.append(message["value"])
+    return SyncResult(dict(records), states, tap, dict(batches))
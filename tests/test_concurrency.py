@@ -0,0 +1,94 @@
+"""Tests for the record prefetching worker pool."""
+
+import itertools
+import threading
+import time
+
+import pytest
+
+from tap_slack.concurrency import PrefetchedRecords, Prefetcher
+
+
+def test_prefetched_records_keep_fetch_order():
+    records = PrefetchedRecords()
+    records.produce({"id": i} for i in range(5))
+    assert [r["id"] for r in records] == [0, 1, 2, 3, 4]
+
+
+def test_prefetched_records_reraise_worker_errors():
+    def fetch():
+        yield {"id": 1}
+        raise RuntimeError("boom")
+
+    records = PrefetchedRecords()
+    records.produce(fetch())
+    iterator = iter(records)
+    assert next(iterator) == {"id": 1}
+    with pytest.raises(RuntimeError, match="boom"):
+        next(iterator)
+
+
+def test_prefetched_records_bound_the_buffer():
+    records = PrefetchedRecords(max_buffered=2)
+    worker = threading.Thread(target=records.produce, args=(range(10),))
+    worker.start()
+    assert list(records) == list(range(10))
+    worker.join(timeout=1)
+    assert not worker.is_alive()
+
+
+def test_prefetcher_returns_finished_contexts_first():
+    release = threading.Event()
+
+    def slow():
+        release.wait(timeout=5)
+        yield {"id": "slow"}
+
+    prefetcher = Prefetcher(max_workers=2)
+    try:
+        prefetcher.submit({"thread_ts": "1"}, slow)
+        prefetcher.submit({"thread_ts": "2"}, lambda: [{"id": "fast"}])
+        while (ready := prefetcher.pop_ready()) is None:
+            pass
+        context, records = ready
+        assert context == {"thread_ts": "2"}
+        assert list(records) == [{"id": "fast"}]
+
+        release.set()
+        context, records = prefetcher.pop_ready(block=True)
+        assert context == {"thread_ts": "1"}
+        assert list(records) == [{"id": "slow"}]
+        assert prefetcher.pop_ready(block=True) is None
+    finally:
+        prefetcher.close()
+
+
+def test_closing_the_prefetcher_releases_workers_of_jobs_being_consumed():
+    prefetcher = Prefetcher(max_workers=1, max_buffered=2)
+    prefetcher.submit("endless", lambda: ({"id": i} for i in itertools.count()))
+    _, records = prefetcher.pop_ready(block=True)
+    # The consumer fails after a record, leaving the worker on a full buffer.
+    assert next(iter(records)) == {"id": 0}
+
+    prefetcher.close()
+    deadline = time.monotonic() + 5
+    while not records.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert records.finished
+
+
+def test_cancelling_prefetched_records_closes_their_generator():
+    closed = threading.Event()
+
+    def fetch():
+        try:
+            yield from itertools.count()
+        finally:
+            closed.set()
+
+    records = PrefetchedRecords(max_buffered=2)
+    worker = threading.Thread(target=records.produce, args=(fetch(),))
+    worker.start()
+    records.cancel()
+    worker.join(timeout=5)
+    assert closed.is_set()
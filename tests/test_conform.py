@@ -0,0 +1,54 @@
+"""Tests for the compiled record conformers."""
+
+import copy
+import logging
+
+from singer_sdk.helpers._catalog import pop_deselected_record_properties
+from singer_sdk.helpers._typing import conform_record_data_types
+from singer_sdk.helpers.conform import TypeConformanceLevel
+from singer_sdk.singerlib.catalog import SelectionMask
+
+from tap_slack.conform import compile_conformer
+from tap_slack.schemas.messages import schema
+
+MESSAGE = {
+    "channel_id": "C1",
+    "ts": "1700000000.000100",
+    "text": "hello",
+    "upload": 1,
+    "unknown": {"nested": True},
+    "bot_profile": {"id": "B1", "deleted": 0, "extra": 1},
+    "reactions": [{"name": "tada", "count": 2, "users": ["U1"], "extra": 1}],
+    "reply_count": float("nan"),
+}
+
+
+def sdk_conform(record: dict, mask: SelectionMask) -> dict:
+    record = copy.deepcopy(record)
+    pop_deselected_record_properties(record, schema, mask)
+    return conform_record_data_types(
+        "messages", record, schema, TypeConformanceLevel.RECURSIVE, logging.getLogger()
+    )
+
+
+def test_conformer_matches_the_sdk():
+    mask = SelectionMask({(): True})
+    unmapped = set()
+    record = compile_conformer(schema, mask)(MESSAGE, unmapped)
+
+    assert record == sdk_conform(MESSAGE, mask)
+    assert record["upload"] is True
+    assert record["reply_count"] is None
+    assert "unknown" not in record
+    assert unmapped == {"unknown"}
+
+
+def test_conformer_drops_deselected_properties():
+    mask = SelectionMask(
+        {(): True, ("properties", "text"): False, ("properties", "bot_profile"): False}
+    )
+    record = compile_conformer(schema, mask)(MESSAGE, set())
+
+    assert record == sdk_conform(MESSAGE, mask)
+    assert "text" not in record
+    assert "bot_profile" not in record
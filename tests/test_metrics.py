@@ -0,0 +1,51 @@
+"""Tests for the sync metrics."""
+
+import logging
+
+from tap_slack.metrics import SyncMetrics
+
+
+def test_metrics_add_up_per_method_and_channel():
+    metrics = SyncMetrics(logging.getLogger(__name__), log_interval=0)
+    metrics.request("conversations.history", "C1", 0.2, 100)
+    metrics.request("conversations.history", "C2", 3.0, 50, throttled=True)
+    metrics.slept("conversations.history", "C2", 1.5)
+    metrics.emitted("conversations.history", "C1", 10)
+    metrics.request("users.list", None, 0.05, 10)
+
+    summary = metrics.summary()
+    history = summary["methods"]["conversations.history"]
+    assert history["requests"] == 2
+    assert history["throttled"] == 1
+    assert history["bytes_received"] == 150
+    assert history["sleep_seconds"] == 1.5
+    assert history["records"] == 10
+    assert history["latency_histogram"]["<=0.25s"] == 1
+    assert history["latency_histogram"]["<=5s"] == 1
+    assert set(summary["channels"]) == {"C1", "C2"}
+    assert summary["channels"]["C1"]["conversations.history"]["records"] == 10
+
+
+def test_channel_metrics_are_kept_apart_by_team():
+    metrics = SyncMetrics(logging.getLogger(__name__), log_interval=0)
+    metrics.request("conversations.history", "C1", 0.2, 100, team_id="T1")
+    metrics.request("conversations.history", "C1", 0.2, 100, team_id="T2")
+    metrics.emitted("conversations.history", "C1", 10, team_id="T2")
+
+    summary = metrics.summary()
+    assert summary["methods"]["conversations.history"]["requests"] == 2
+    assert summary["channels"] == {}
+    teams = summary["teams"]
+    assert teams["T1"]["channels"]["C1"]["conversations.history"]["records"] == 0
+    assert teams["T2"]["channels"]["C1"]["conversations.history"]["records"] == 10
+
+
+def test_metrics_are_logged_at_the_interval(caplog):
+    metrics = SyncMetrics(logging.getLogger(__name__), log_interval=3600)
+    with caplog.at_level(logging.INFO):
+        metrics.request("users.list", None, 0.05, 10)
+        assert not caplog.records
+        metrics.log_interval = 1e-9
+        metrics.request("users.list", None, 0.05, 10)
+    assert '"method": "users.list"' in caplog.text
+    assert '"requests": 2' in caplog.text
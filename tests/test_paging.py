@@ -0,0 +1,35 @@
+"""Tests for the adaptive page sizes."""
+
+from tap_slack.paging import MAX_LIMIT, MIN_LIMIT, PageSizer
+
+
+def test_page_size_grows_to_the_method_maximum():
+    sizer = PageSizer(max_page_bytes=1_000_000, max_page_seconds=10)
+    assert sizer.limit("conversations.history", ("T1", "C1"), 500) == 500
+
+    sizer.observe("conversations.history", ("T1", "C1"), 500, 100_000, 0.5, True)
+    assert sizer.limit("conversations.history", ("T1", "C1"), 500) == 999
+    # Channels without pages yet start from the method's averages.
+    assert sizer.limit("conversations.history", ("T1", "C2"), 500) == 999
+
+
+def test_page_size_stays_under_slacks_maximum():
+    sizer = PageSizer(max_page_bytes=1_000_000, max_page_seconds=10)
+    assert sizer.limit("users.list", (), 500) == 500
+    assert sizer.limit("users.list", (), 5000) == MAX_LIMIT
+    sizer.observe("conversations.members", ("T1", "C1"), 500, 5_000, 0.1, True)
+    assert sizer.limit("conversations.members", ("T1", "C1")) == MAX_LIMIT
+
+
+def test_page_size_keeps_pages_under_the_caps():
+    sizer = PageSizer(max_page_bytes=1_000_000, max_page_seconds=10)
+    # 10 KB per record fits 100 records in the byte cap.
+    sizer.observe("conversations.history", ("T1", "C1"), 200, 2_000_000, 1, True)
+    assert sizer.limit("conversations.history", ("T1", "C1")) == 100
+
+    # 0.5 seconds per record on a full page fits 20 records in 10 seconds.
+    sizer.observe("conversations.replies", ("T1", "C1"), 100, 1000, 50, True)
+    assert sizer.limit("conversations.replies", ("T1", "C1")) == MIN_LIMIT
+    # The latency of a last page is not taken as per-record latency.
+    sizer.observe("users.list", (), 2, 1000, 5, False)
+    assert sizer.limit("users.list") == MAX_LIMIT
@@ -0,0 +1,35 @@
+"""Tests for the sync plan built from the tap config."""
+
+from tap_slack.plan import SyncPlan
+
+CONFIG = {"thread_lookback_days": 1}
+
+
+def test_plan_includes_all_channels_without_selection():
+    plan = SyncPlan.from_config({**CONFIG, "excluded_channels": ["C2"]})
+    assert plan.includes_channel("C1", "general")
+    assert not plan.includes_channel("C2", "random")
+
+
+def test_plan_selects_by_id_or_name_pattern():
+    plan = SyncPlan.from_config(
+        {
+            **CONFIG,
+            "selected_channels": ["C1"],
+            "selected_channel_patterns": ["eng-*"],
+            "excluded_channel_patterns": ["*-archive"],
+        }
+    )
+    assert plan.includes_channel("C1", "general")
+    assert plan.includes_channel("C2", "eng-data")
+    assert not plan.includes_channel("C3", "eng-data-archive")
+    assert not plan.includes_channel("C4", "random")
+
+
+def test_plan_fixes_cutoffs_at_the_start_of_the_run():
+    plan = SyncPlan.from_config(
+        {"thread_lookback_days": 2, "start_date": "2024-01-01T00:00:00"},
+        now=1_000_000.0,
+    )
+    assert plan.thread_lookback_start == 1_000_000.0 - 2 * 86400
+    assert plan.start_timestamp == 1_704_067_200.0
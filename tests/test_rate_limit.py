@@ -0,0 +1,62 @@
+"""Tests for the per-method rate limiter."""
+
+import time
+
+from tap_slack.rate_limit import RECOVERY_STREAK, RateLimiter, TokenBucket
+
+
+def test_bucket_allows_burst_without_waiting():
+    bucket = TokenBucket(requests_per_minute=600, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+def test_bucket_waits_only_for_missing_tokens():
+    bucket = TokenBucket(requests_per_minute=600, burst=1)
+    assert bucket.reserve() == 0.0
+    # 600 rpm refills one token every 0.1 seconds.
+    assert 0.0 < bucket.reserve() <= 0.1
+    # A second waiter queues behind the first reservation.
+    assert 0.1 < bucket.reserve() <= 0.2
+
+
+def test_bucket_credits_time_spent_elsewhere():
+    bucket = TokenBucket(requests_per_minute=600, burst=1)
+    bucket.reserve()
+    time.sleep(0.1)
+    assert bucket.reserve() == 0.0
+
+
+def test_bucket_spaces_requests_after_a_pause():
+    bucket = TokenBucket(requests_per_minute=600, burst=5)
+    bucket.pause(1)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert 0.9 < waits[0] <= 1.0
+    # 600 rpm spaces requests 0.1 seconds apart, with no burst at the end.
+    gaps = [later - earlier for earlier, later in zip(waits, waits[1:])]
+    assert all(abs(gap - 0.1) < 0.01 for gap in gaps)
+
+
+def test_limiter_uses_method_tiers_and_overrides():
+    limiter = RateLimiter({"conversations.history": 40})
+    assert limiter.requests_per_minute("conversations.history") == 40
+    assert limiter.requests_per_minute("users.list") == 20
+    assert limiter.requests_per_minute("conversations.members") == 100
+    assert limiter.bucket("users.list") is limiter.bucket("users.list")
+
+
+def test_throttled_method_is_paused_and_slowed():
+    limiter = RateLimiter({"conversations.history": 600})
+    limiter.throttled("conversations.history", retry_after=1)
+    bucket = limiter.bucket("conversations.history")
+    assert bucket.requests_per_minute == 300
+    assert 0.9 < bucket.reserve() <= 1.0
+    assert limiter.bucket("users.list").reserve() == 0.0
+    assert limiter.throttle_counts == {"conversations.history": 1}
+
+
+def test_throttled_rate_recovers_after_successes():
+    limiter = RateLimiter({"conversations.history": 600})
+    limiter.throttled("conversations.history", retry_after=0)
+    for _ in range(RECOVERY_STREAK):
+        limiter.succeeded("conversations.history")
+    assert limiter.bucket("conversations.history").requests_per_minute == 360
@@ -0,0 +1,52 @@
+"""Tests for the response cache."""
+
+import requests
+
+from tap_slack.response_cache import ResponseCache
+
+
+def prepare(url: str) -> requests.PreparedRequest:
+    return requests.Request("GET", url).prepare()
+
+
+def response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = "application/json"
+    response._content = content
+    return response
+
+
+def test_cache_keys_ignore_the_page_size_and_parameter_order():
+    first = prepare("https://slack.com/api/conversations.history?channel=C1&limit=20")
+    second = prepare("https://slack.com/api/conversations.history?limit=999&channel=C1")
+    other = prepare("https://slack.com/api/conversations.history?channel=C2")
+
+    assert ResponseCache.key(None, first) == ResponseCache.key(None, second)
+    assert ResponseCache.key(None, first) != ResponseCache.key("T1", first)
+    assert ResponseCache.key(None, first) != ResponseCache.key(None, other)
+
+
+def test_modes_serve_and_store_responses(tmp_path):
+    path = tmp_path / "responses.sqlite"
+    request = prepare("https://slack.com/api/users.list?cursor=abc")
+    key = ResponseCache.key(None, request)
+
+    recorder = ResponseCache(path, "record")
+    assert recorder.get(key, request) is None
+    recorder.put(key, response(b'{"ok": true}'))
+
+    replayed = ResponseCache(path, "replay").get(key, request)
+    assert replayed.json() == {"ok": True}
+    assert replayed.headers["content-type"] == "application/json"
+    assert ResponseCache(path, "ttl", ttl_seconds=60).get(key, request) is not None
+    assert ResponseCache(path, "ttl", ttl_seconds=0).get(key, request) is None
+
+
+def test_replays_start_when_the_recorded_run_did(tmp_path):
+    path = tmp_path / "responses.sqlite"
+    assert ResponseCache(path, "record").start_run(1000.0) == 1000.0
+    assert ResponseCache(path, "replay").start_run(5000.0) == 1000.0
+    assert ResponseCache(path, "ttl", ttl_seconds=3600).start_run(2000.0) == 1000.0
+    assert ResponseCache(path, "ttl", ttl_seconds=60).start_run(2000.0) == 2000.0
+    assert ResponseCache(path, "replay").start_run(5000.0) == 2000.0
@@ -0,0 +1,38 @@
+"""Tests that keep the tap's startup cheap."""
+
+import subprocess
+import sys
+
+from tap_slack.tap import TapSlack
+
+CONFIG = {"api_key": "xoxb-test", "start_date": "2024-01-01T00:00:00"}
+
+
+def select_streams(catalog: dict, names: set[str]) -> dict:
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] in names
+    return catalog
+
+
+def test_importing_the_tap_does_not_build_schemas():
+    code = (
+        "import sys, tap_slack.tap; "
+        "print(sorted(m for m in sys.modules if m.startswith('tap_slack.schemas.')))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
+
+
+def test_only_selected_streams_and_their_parents_are_created():
+    catalog = TapSlack(config=CONFIG).catalog.to_dict()
+    tap = TapSlack(config=CONFIG, catalog=select_streams(catalog, {"threads", "users"}))
+
+    assert sorted(tap.streams) == ["channels", "messages", "threads", "users"]
+    assert [name for name, stream in tap.streams.items() if stream.selected] == [
+        "threads",
+        "users",
+    ]
@@ -0,0 +1,57 @@
+"""Tests for the indexed stream state and STATE message pacing."""
+
+import pytest
+
+from tap_slack.state import IndexedStateManager, StateMessageThrottle
+
+
+def manager(tap_state: dict) -> IndexedStateManager:
+    return IndexedStateManager(stream_name="messages", tap_state=tap_state)
+
+
+def test_partition_states_are_found_and_created_by_context():
+    partition = {"context": {"channel_id": "C1"}, "replication_key_value": "1.0"}
+    tap_state = {"bookmarks": {"messages": {"partitions": [partition]}}}
+    states = manager(tap_state)
+
+    assert states.get_context_state({"channel_id": "C1"}) is partition
+    created = states.get_context_state({"channel_id": "C2"})
+    assert created == {"context": {"channel_id": "C2"}}
+    assert states.get_context_state({"channel_id": "C2"}) is created
+    assert tap_state["bookmarks"]["messages"]["partitions"] == [partition, created]
+
+    # Partitions replaced from outside are indexed again.
+    replaced = {"context": {"channel_id": "C1"}}
+    tap_state["bookmarks"]["messages"]["partitions"] = [replaced]
+    assert states.get_context_state({"channel_id": "C1"}) is replaced
+
+
+def test_duplicate_partitions_are_rejected():
+    partition = {"context": {"channel_id": "C1"}}
+    states = manager({"bookmarks": {"messages": {"partitions": [partition] * 2}}})
+    with pytest.raises(ValueError, match="duplicate"):
+        states.get_context_state({"channel_id": "C1"})
+
+
+def test_pruned_partitions_are_dropped():
+    tap_state = {}
+    states = manager(tap_state)
+    for channel_id in ("C1", "C2", "C3"):
+        states.get_context_state({"channel_id": channel_id})
+
+    assert states.prune(lambda context: context["channel_id"] != "C2") == 2
+    assert tap_state["bookmarks"]["messages"]["partitions"] == [
+        {"context": {"channel_id": "C2"}}
+    ]
+    assert not states.is_flushed
+    assert states.get_context_state({"channel_id": "C1"}) == {
+        "context": {"channel_id": "C1"}
+    }
+
+
+def test_state_messages_are_spaced_out():
+    throttle = StateMessageThrottle(interval=60)
+    assert throttle.due()
+    throttle.written()
+    assert not throttle.due()
+    assert StateMessageThrottle(interval=0).due()
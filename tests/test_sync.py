@@ -0,0 +1,521 @@
+"""Offline sync tests against the Slack API stand-in."""
+
+import gzip
+import json
+import time
+
+import pytest
+from singer_sdk.batch import Batcher
+from singer_sdk.exceptions import ConfigValidationError, FatalAPIError
+
+from tap_slack.tap import TapSlack
+from tests.fake_slack import FakeSlackAdapter, FakeSlackWorkspaces, Workspace, run_sync
+
+
+def test_sync_emits_every_stream():
+    workspace = Workspace(channels=2, messages_per_channel=20, replies_per_thread=2)
+    config = {"thread_workers": 2, "thread_lookback_days": 7}
+    result = run_sync(FakeSlackAdapter(workspace), config)
+
+    assert len(result.records["channels"]) == 2
+    assert len(result.records["users"]) == workspace.users
+    assert len(result.records["messages"]) <= 40
+    # Two threads per channel, without their parent messages.
+    assert len(result.records["threads"]) == 2 * 2 * 2
+    assert all(r["ts"] != r["thread_ts"] for r in result.records["threads"])
+
+
+def test_second_sync_only_fetches_changed_threads():
+    workspace = Workspace(channels=1, messages_per_channel=20, history_days=1)
+    first = run_sync(FakeSlackAdapter(workspace))
+
+    # Only threads started within the default one day lookback are revisited.
+    thread_ts = max(ts for _, ts in workspace.replies)
+    workspace.add_reply("C00000", thread_ts)
+    adapter = FakeSlackAdapter(workspace)
+    second = run_sync(adapter, state=first.state)
+
+    replies = [params for method, params in adapter.calls if method.endswith("replies")]
+    assert [params["ts"] for params in replies] == [thread_ts]
+    # Only the replies after the latest reply synced are requested.
+    parent = next(m for m in workspace.history["C00000"] if m["ts"] == thread_ts)
+    assert replies[0]["oldest"] == workspace.replies["C00000", thread_ts][-2]["ts"]
+    assert [r["ts"] for r in second.records["threads"]] == [parent["latest_reply"]]
+
+
+def test_unchanged_threads_are_not_requested_again():
+    workspace = Workspace(channels=2, messages_per_channel=20, history_days=1)
+    config = {"thread_lookback_days": 2}
+    adapter = FakeSlackAdapter(workspace)
+    first = run_sync(adapter, config)
+    assert adapter.requests["conversations.replies"] == len(workspace.replies)
+
+    # Every thread is within the lookback, and none has new replies.
+    adapter = FakeSlackAdapter(workspace)
+    second = run_sync(adapter, config, first.state)
+
+    assert adapter.requests["conversations.history"] == 2
+    assert adapter.requests["conversations.replies"] == 0
+    assert "threads" not in second.records
+
+
+def test_threads_without_replies_are_not_requested():
+    workspace = Workspace(channels=1, messages_per_channel=20, replies_per_thread=0)
+    adapter = FakeSlackAdapter(workspace)
+    result = run_sync(adapter)
+
+    assert adapter.requests["conversations.replies"] == 0
+    assert "threads" not in result.records
+
+
+def test_users_cache_emits_only_updated_users(tmp_path):
+    workspace = Workspace(channels=1, messages_per_channel=1)
+    config = {"users_cache_path": str(tmp_path / "users.json")}
+    first = run_sync(FakeSlackAdapter(workspace), config)
+    assert len(first.records["users"]) == workspace.users
+
+    workspace.user_list[0]["updated"] += 1
+    second = run_sync(FakeSlackAdapter(workspace), config)
+    assert [user["id"] for user in second.records["users"]] == ["U00000"]
+
+    config["users_cache_ttl_hours"] = 0
+    third = run_sync(FakeSlackAdapter(workspace), config)
+    assert len(third.records["users"]) == workspace.users
+
+
+def test_users_cache_is_saved_once_the_users_batch_is_written(tmp_path, monkeypatch):
+    workspace = Workspace(channels=1, messages_per_channel=1)
+    cache_path = tmp_path / "users.json"
+    config = {
+        "users_cache_path": str(cache_path),
+        "batch_config": {
+            "encoding": {"format": "jsonl", "compression": "gzip"},
+            "storage": {"root": tmp_path.as_uri()},
+            "batch_size": 1000,
+        },
+    }
+    get_batches = Batcher.get_batches
+
+    def fail_users_batch(self, records):
+        if self.stream_name != "users":
+            return get_batches(self, records)
+        list(records)
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Batcher, "get_batches", fail_users_batch)
+        run_sync(FakeSlackAdapter(workspace), config, expect_error=OSError)
+    assert not cache_path.exists()
+
+    result = run_sync(FakeSlackAdapter(workspace), config)
+    assert len(result.batches["users"]) == 1
+    assert cache_path.exists()
+
+
+def test_unchanged_channels_skip_members_and_archived_messages():
+    workspace = Workspace(channels=3, messages_per_channel=5, archived_channels=1)
+    first = run_sync(FakeSlackAdapter(workspace))
+
+    workspace.channel_list[1]["num_members"] += 1
+    adapter = FakeSlackAdapter(workspace)
+    second = run_sync(adapter, {"emit_unchanged_channels": False}, first.state)
+
+    assert [channel["id"] for channel in second.records["channels"]] == ["C00001"]
+    members_calls = [p["channel"] for m, p in adapter.calls if m.endswith("members")]
+    assert members_calls == ["C00001"]
+    history_calls = [p["channel"] for m, p in adapter.calls if m.endswith("history")]
+    assert sorted(history_calls) == ["C00001", "C00002"]
+
+
+def test_backfill_fetches_windows_and_resumes_pending_ones():
+    workspace = Workspace(channels=1, messages_per_channel=50, history_days=10)
+    config = {"backfill_window_days": 2, "thread_lookback_days": 0}
+    adapter = FakeSlackAdapter(workspace)
+    result = run_sync(adapter, config)
+
+    history_calls = [p for m, p in adapter.calls if m.endswith("history")]
+    assert len(history_calls) == 6
+    timestamps = [message["ts"] for message in result.records["messages"]]
+    assert len(timestamps) == len(set(timestamps)) == 50
+    partition = result.state["bookmarks"]["messages"]["partitions"][0]
+    assert "backfill_windows" not in partition
+    assert partition["replication_key_value"] == max(timestamps)
+
+    # Resume a backfill interrupted with one window left.
+    pending = [workspace.now - 4 * 86400 + 60, workspace.now - 2 * 86400 + 60]
+    partition = {
+        "context": {"channel_id": "C00000"},
+        "backfill_windows": [pending],
+        "backfill_until": workspace.now - 60,
+    }
+    state = {"bookmarks": {"messages": {"partitions": [partition]}}}
+    adapter = FakeSlackAdapter(workspace)
+    result = run_sync(adapter, config, state)
+
+    history_calls = [p for m, p in adapter.calls if m.endswith("history")]
+    assert [float(p["oldest"]) for p in history_calls] == [
+        pending[0],
+        workspace.now - 60,
+    ]
+    assert len(result.records["messages"]) == 10
+
+
+def test_cursor_checkpoints_are_saved_and_resumed():
+    workspace = Workspace(channels=1, messages_per_channel=1200, thread_density=0)
+    config = {"cursor_checkpoint_pages": 1, "adaptive_page_size": False}
+    result = run_sync(FakeSlackAdapter(workspace), config)
+
+    checkpoints = [
+        partition["cursor_checkpoint"]
+        for state in result.states
+        for partition in state["bookmarks"]["messages"].get("partitions", [])
+        if "cursor_checkpoint" in partition
+    ]
+    assert [checkpoint["cursor"] for checkpoint in checkpoints] == ["500", "1000", None]
+    partition = result.state["bookmarks"]["messages"]["partitions"][0]
+    assert "cursor_checkpoint" not in partition
+
+    # Resume from the second page, as if the first sync had stopped there.
+    checkpoint = checkpoints[0]
+    state = {
+        "bookmarks": {
+            "messages": {
+                "partitions": [
+                    {
+                        "context": {"channel_id": "C00000"},
+                        "cursor_checkpoint": checkpoint,
+                    }
+                ]
+            }
+        }
+    }
+    adapter = FakeSlackAdapter(workspace)
+    resumed = run_sync(adapter, config, state)
+
+    history_calls = [p for m, p in adapter.calls if m.endswith("history")]
+    assert history_calls[0]["cursor"] == "500"
+    assert float(history_calls[-1]["oldest"]) == checkpoint["latest"]
+    assert len(resumed.records["messages"]) == 700
+    partition = resumed.state["bookmarks"]["messages"]["partitions"][0]
+    assert partition["replication_key_value"] == checkpoint["max_ts"]
+
+
+def test_lookback_only_emits_new_and_changed_messages():
+    workspace = Workspace(channels=1, messages_per_channel=20, history_days=1)
+    config = {"thread_lookback_days": 2}
+    first = run_sync(FakeSlackAdapter(workspace), config)
+    assert len(first.records["messages"]) == 20
+
+    message = workspace.history["C00000"][5]
+    message["reactions"] = [{"name": "tada", "count": 1, "users": ["U00001"]}]
+    second = run_sync(FakeSlackAdapter(workspace), config, first.state)
+
+    assert [m["ts"] for m in second.records["messages"]] == [message["ts"]]
+    # Only messages that can still change are indexed, besides the bookmark.
+    partition = second.state["bookmarks"]["messages"]["partitions"][0]
+    threaded = {m["ts"] for m in workspace.history["C00000"] if m.get("reply_count")}
+    assert set(partition["emitted_messages"]) == threaded | {message["ts"]}
+
+    del message["reactions"]
+    third = run_sync(FakeSlackAdapter(workspace), config, second.state)
+
+    assert [m["ts"] for m in third.records["messages"]] == [message["ts"]]
+    partition = third.state["bookmarks"]["messages"]["partitions"][0]
+    assert set(partition["emitted_messages"]) == threaded
+
+
+def test_second_sync_without_changes_emits_no_messages():
+    # Every message is older than the default one day thread lookback.
+    workspace = Workspace(
+        channels=1, messages_per_channel=20, history_days=1, now=time.time() - 86400 * 3
+    )
+    first = run_sync(FakeSlackAdapter(workspace))
+    assert len(first.records["messages"]) == 20
+
+    second = run_sync(FakeSlackAdapter(workspace), state=first.state)
+
+    assert "messages" not in second.records
+
+
+def test_batch_mode_writes_files_for_large_streams(tmp_path):
+    workspace = Workspace(channels=2, messages_per_channel=30, history_days=1)
+    config = {
+        "batch_config": {
+            "encoding": {"format": "jsonl", "compression": "gzip"},
+            "storage": {"root": tmp_path.as_uri()},
+            "batch_size": 1000,
+        }
+    }
+    result = run_sync(FakeSlackAdapter(workspace), config)
+
+    assert set(result.records) == {"channels", "channel_members"}
+    assert sorted(result.batches) == ["messages", "threads", "users"]
+    # Thread replies are batched per channel rather than per thread.
+    assert len(result.batches["threads"]) == 2
+
+    def count(stream):
+        lines = 0
+        for manifest in result.batches[stream]:
+            for url in manifest:
+                with gzip.open(url.removeprefix("file://")) as file:
+                    lines += len(file.readlines())
+        return lines
+
+    assert count("messages") == 60
+    assert count("threads") == 2 * 3 * 3
+
+
+def test_streams_share_a_pooled_session():
+    workspace = Workspace(channels=1, messages_per_channel=1)
+    result = run_sync(FakeSlackAdapter(workspace), {"channel_workers": 2})
+
+    sessions = {id(stream.requests_session) for stream in result.tap.streams.values()}
+    assert len(sessions) == 1
+    adapter = result.tap.http_session.get_adapter("https://example.com/")
+    assert adapter._pool_maxsize == 2 * (1 + 4 + 4)
+
+
+def test_sync_writes_a_metrics_summary(tmp_path):
+    workspace = Workspace(channels=2, messages_per_channel=20, history_days=1)
+    path = tmp_path / "metrics.json"
+    result = run_sync(FakeSlackAdapter(workspace), {"metrics_summary_path": str(path)})
+
+    summary = json.loads(path.read_text())
+    history = summary["methods"]["conversations.history"]
+    assert history["requests"] == 2
+    assert history["records"] == len(result.records["messages"])
+    assert history["bytes_received"] > 0
+    assert set(summary["channels"]) == {"C00000", "C00001"}
+
+
+def test_auto_join_skips_messages_of_channels_that_failed_to_join():
+    workspace = Workspace(
+        channels=3,
+        messages_per_channel=5,
+        unjoined_channels=2,
+        join_errors={"C00002": "is_archived"},
+    )
+    config = {"auto_join_channels": True}
+    adapter = FakeSlackAdapter(workspace)
+    first = run_sync(adapter, config)
+
+    assert adapter.requests["conversations.join"] == 2
+    history = [p["channel"] for m, p in adapter.calls if m.endswith("history")]
+    assert sorted(history) == ["C00000", "C00001"]
+    failures = first.state["bookmarks"]["channels"]["join_failures"]
+    assert failures["C00002"]["error"] == "is_archived"
+
+    # The failed join is not retried until `auto_join_retry_hours` passed.
+    adapter = FakeSlackAdapter(workspace)
+    run_sync(adapter, config, state=first.state)
+    assert adapter.requests["conversations.join"] == 0
+    adapter = FakeSlackAdapter(workspace)
+    run_sync(adapter, {**config, "auto_join_retry_hours": 0}, state=first.state)
+    assert adapter.requests["conversations.join"] == 1
+
+
+def test_auto_join_retries_channels_that_failed_without_a_slack_error():
+    workspace = Workspace(channels=2, messages_per_channel=5, unjoined_channels=1)
+    config = {"auto_join_channels": True}
+    adapter = FakeSlackAdapter(workspace, errors={"conversations.join": {1: 503}})
+    first = run_sync(adapter, config)
+
+    history = [p["channel"] for m, p in adapter.calls if m.endswith("history")]
+    assert history == ["C00000"]
+    assert "join_failures" not in first.state["bookmarks"]["channels"]
+
+    adapter = FakeSlackAdapter(workspace)
+    run_sync(adapter, config, state=first.state)
+    assert adapter.requests["conversations.join"] == 1
+    history = [p["channel"] for m, p in adapter.calls if m.endswith("history")]
+    assert "C00001" in history
+
+
+def test_record_conformance_can_be_skipped_per_stream():
+    workspace = Workspace(channels=1, messages_per_channel=10, thread_density=0)
+    for message in workspace.history["C00000"]:
+        message["unknown"] = 1
+
+    full = run_sync(FakeSlackAdapter(workspace))
+    assert not any("unknown" in record for record in full.records["messages"])
+
+    config = {"record_conformance": {"messages": "none"}}
+    skipped = run_sync(FakeSlackAdapter(workspace), config)
+    assert all("unknown" in record for record in skipped.records["messages"])
+
+    config = {
+        "record_conformance": {"messages": "sample"},
+        "record_conformance_sample_rate": 5,
+    }
+    sampled = run_sync(FakeSlackAdapter(workspace), config)
+    conformed = [r for r in sampled.records["messages"] if "unknown" not in r]
+    assert len(conformed) == 2
+
+
+def test_workspaces_sync_within_their_own_rate_limits():
+    adapters = {
+        f"xoxb-{team_id}": FakeSlackAdapter(
+            Workspace(channels=2, messages_per_channel=5)
+        )
+        for team_id in ("T1", "T2")
+    }
+    config = {
+        "workspaces": [
+            {"team_id": "T1", "api_key": "xoxb-T1"},
+            {"team_id": "T2", "api_key": "xoxb-T2"},
+        ]
+    }
+    result = run_sync(FakeSlackWorkspaces(adapters), config)
+
+    for adapter in adapters.values():
+        assert adapter.requests["conversations.history"] == 2
+    assert sorted(result.tap.rate_limiters) == ["T1", "T2"]
+    # Channel ids repeat across the fake workspaces, and stay apart by team.
+    channels = {(r["team_id"], r["id"]) for r in result.records["channels"]}
+    assert len(channels) == 4
+    messages = {
+        (r["team_id"], r["channel_id"], r["ts"]) for r in result.records["messages"]
+    }
+    assert len(messages) == 20
+    assert result.tap.streams["messages"].primary_keys == [
+        "team_id",
+        "channel_id",
+        "ts",
+    ]
+    # Users are keyed by the workspace synced rather than their home team.
+    assert {r["team_id"] for r in result.records["users"]} == {"T1", "T2"}
+    partitions = result.state["bookmarks"]["messages"]["partitions"]
+    assert {p["context"]["team_id"] for p in partitions} == {"T1", "T2"}
+    channels_state = result.state["bookmarks"]["channels"]["partitions"]
+    assert all(p["channel_fingerprints"] for p in channels_state)
+
+
+def test_config_requires_an_api_key_or_workspaces():
+    with pytest.raises(ConfigValidationError) as excinfo:
+        TapSlack(config={"start_date": "2024-01-01T00:00:00"})
+
+    assert excinfo.value.errors == ["Either api_key or workspaces must be set"]
+
+
+def test_adaptive_page_size_makes_fewer_requests():
+    workspace = Workspace(
+        channels=1, messages_per_channel=3000, thread_density=0, users=1000
+    )
+    fixed = FakeSlackAdapter(workspace)
+    run_sync(fixed, {"adaptive_page_size": False})
+    adaptive = FakeSlackAdapter(workspace)
+    run_sync(adaptive)
+
+    assert fixed.requests["conversations.history"] == 6
+    assert adaptive.requests["conversations.history"] == 4
+    limits = [p["limit"] for m, p in adaptive.calls if m.endswith("history")]
+    assert limits == ["500", "999", "999", "999"]
+    # Listing methods grow past the fixed page size too.
+    assert fixed.requests["users.list"] == 2
+    limits = [p["limit"] for m, p in adaptive.calls if m == "users.list"]
+    assert limits == ["500", "999"]
+
+
+def test_replayed_sync_makes_no_requests(tmp_path):
+    workspace = Workspace(channels=2, messages_per_channel=20)
+    config = {"response_cache_path": str(tmp_path / "responses.sqlite")}
+    recorded = run_sync(
+        FakeSlackAdapter(workspace), {**config, "response_cache_mode": "record"}
+    )
+
+    adapter = FakeSlackAdapter(workspace)
+    replayed = run_sync(adapter, {**config, "response_cache_mode": "replay"})
+
+    assert adapter.calls == []
+    assert replayed.records == recorded.records
+
+
+def test_state_is_pruned_and_written_sparingly():
+    workspace = Workspace(channels=6, messages_per_channel=5)
+    first = run_sync(FakeSlackAdapter(workspace))
+
+    # One STATE message after the first channel and one at the end, rather
+    # than one per channel.
+    assert len(first.states) == 2
+    assert len(first.state["bookmarks"]["messages"]["partitions"]) == 6
+    unthrottled = run_sync(FakeSlackAdapter(workspace), {"state_message_interval": 0})
+    assert len(unthrottled.states) > 6
+
+    excluded = ["C00000", "C00001", "C00002"]
+    second = run_sync(
+        FakeSlackAdapter(workspace), {"excluded_channels": excluded}, first.state
+    )
+    partitions = second.state["bookmarks"]["messages"]["partitions"]
+    assert sorted(p["context"]["channel_id"] for p in partitions) == [
+        "C00003",
+        "C00004",
+        "C00005",
+    ]
+
+
+def test_server_errors_with_html_bodies_are_retried():
+    workspace = Workspace(channels=1, messages_per_channel=10, thread_density=0)
+    adapter = FakeSlackAdapter(workspace, errors={"conversations.history": {1: 503}})
+    result = run_sync(adapter)
+
+    assert adapter.requests["conversations.history"] == 2
+    assert len(result.records["messages"]) == 10
+
+
+def test_failed_sync_writes_no_state_for_unbatched_records(tmp_path):
+    workspace = Workspace(channels=2, messages_per_channel=1500, thread_density=0)
+    config = {
+        "batch_config": {
+            "encoding": {"format": "jsonl", "compression": "gzip"},
+            "storage": {"root": tmp_path.as_uri()},
+            "batch_size": 100000,
+        }
+    }
+    # The second page of the second channel fails.
+    adapter = FakeSlackAdapter(workspace, errors={"conversations.history": {5: 400}})
+    failed = run_sync(adapter, config, expect_error=FatalAPIError)
+    resumed = run_sync(FakeSlackAdapter(workspace), config, failed.state)
+
+    messages = set()
+    for result in (failed, resumed):
+        for manifest in result.batches["messages"]:
+            for url in manifest:
+                with gzip.open(url.removeprefix("file://")) as file:
+                    for line in file:
+                        record = json.loads(line)
+                        messages.add((record["channel_id"], record["ts"]))
+    assert len(messages) == 3000
+
+
+def test_batch_mode_records_messages_in_state_once_batched(tmp_path):
+    workspace = Workspace(
+        channels=1, messages_per_channel=700, thread_density=0.5, history_days=1
+    )
+    config = {
+        "batch_config": {
+            "encoding": {"format": "jsonl", "compression": "gzip"},
+            "storage": {"root": tmp_path.as_uri()},
+            "batch_size": 300,
+        },
+        "cursor_checkpoint_pages": 1,
+        "rate_limits": {"conversations.replies": 600_000},
+    }
+    # Thread replies are batched, writing STATE messages, before the second
+    # page of messages fails.
+    adapter = FakeSlackAdapter(workspace, errors={"conversations.history": {2: 400}})
+    failed = run_sync(adapter, config, expect_error=FatalAPIError)
+    assert failed.batches["threads"]
+    assert not any(
+        "cursor_checkpoint" in partition
+        for state in failed.states
+        for partition in state["bookmarks"]["messages"].get("partitions", [])
+    )
+    resumed = run_sync(FakeSlackAdapter(workspace), config, failed.state)
+
+    timestamps = set()
+    for result in (failed, resumed):
+        for manifest in result.batches.get("messages", []):
+            for url in manifest:
+                with gzip.open(url.removeprefix("file://")) as file:
+                    timestamps.update(json.loads(line)["ts"] for line in file)
+    assert len(timestamps) == 700
@@ -0,0 +1,25 @@
+"""Tests for the user directory cache."""
+
+from tap_slack.users import UserDirectory
+
+
+def test_directory_reports_new_and_updated_users():
+    directory = UserDirectory()
+    assert directory.update({"id": "U1", "name": "ada", "updated": 1})
+    assert not directory.update({"id": "U1", "name": "ada", "updated": 1})
+    assert directory.update({"id": "U1", "name": "ada.l", "updated": 2})
+    assert directory.users["U1"]["name"] == "ada.l"
+
+
+def test_directory_round_trips_through_its_file(tmp_path):
+    path = tmp_path / "users.json"
+    directory = UserDirectory(path)
+    directory.update({"id": "U1", "updated": 1})
+    directory.update({"id": "U2", "updated": 1})
+    directory.refreshed({"U1"})
+    directory.save()
+
+    loaded = UserDirectory(path)
+    assert set(loaded.users) == {"U1"}
+    assert not loaded.is_stale(ttl_seconds=60)
+    assert loaded.is_stale(ttl_seconds=0)